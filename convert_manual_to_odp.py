@@ -2,21 +2,308 @@
 # -*- coding: utf-8 -*-
 """
 Script corregido para convertir Manual_Usuario_Dashboard.md a formato .odp válido para LibreOffice Impress
+
+Uso básico (genera Manual_Usuario_Dashboard.odp junto al Markdown):
+  python convert_manual_to_odp.py Manual_Usuario_Dashboard.md
+
+Carpetas y patrones (recursivo; se replica el árbol bajo --out-dir):
+  python convert_manual_to_odp.py . 'docs/**/*.md' --out-dir decks/ --jobs 0 --exclude 'vendor/*'
+
+Opciones:
+  --out ruta.odp       Ruta de salida (si un único Markdown)
+  --out-dir DIR        Directorio de salida (replica el árbol de las carpetas/patrones)
+  --jobs N             Procesos en paralelo (0 = todos los núcleos)
+  --cache-dir DIR      Caché de render por slide: solo se regeneran las secciones modificadas
+  --exclude PATRÓN     Excluir rutas (relativas a la carpeta o patrón) que casen con PATRÓN; repetible
+  --compress-level N   Nivel de compresión 0-9 (1 = borradores rápidos, 9 = publicación; por defecto el de zlib)
+  --watch              Tras la pasada inicial, vigila los Markdown y regenera solo los decks modificados
+  --watch-interval S   Segundos entre sondeos en modo --watch (por defecto 0.5)
+  --debounce S         Segundos sin cambios antes de regenerar (agrupa ráfagas de guardados; por defecto 0.5)
+
+Los .odp se escriben en un temporal y se renombran, así que nunca quedan a medias.
+Al regenerar un .odp existente, las partes que no cambian se copian de él sin recomprimir
+(content.xml incluido si el Markdown no ha cambiado).
+
+Los Markdown sin secciones '## ' se omiten. Código de salida: 0 si todo OK, 1 si alguno falló.
 """
 
+import argparse
+import contextlib
+import fnmatch
+import glob
+import hashlib
+import io
+import itertools
+import json
 import os
+import struct
+import sys
+import time
 import zipfile
+import zlib
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import re
-import shutil
-import html
+
+MIMETYPE = 'application/vnd.oasis.opendocument.presentation'
+
+# Escapado en una sola pasada. Reproduce exactamente la salida histórica de
+# html.escape() seguido de los replace() ('&', '<' y '>' quedan doblemente
+# escapados), para que los decks generados no cambien byte a byte.
+XML_ESCAPES = str.maketrans({
+    '&': '&amp;amp;',
+    '<': '&amp;lt;',
+    '>': '&amp;gt;',
+    '"': '&quot;',
+    "'": '&apos;',
+})
+
+CONTENT_XML_HEAD = '\n'.join([
+    '<?xml version="1.0" encoding="UTF-8"?>',
+    '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"',
+    '                        xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0"',
+    '                        xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"',
+    '                        xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"',
+    '                        xmlns:draw="urn:oasis:names:tc:opendocument:xmlns:drawing:1.0"',
+    '                        xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0"',
+    '                        xmlns:xlink="http://www.w3.org/1999/xlink"',
+    '                        xmlns:dc="http://purl.org/dc/elements/1.1/"',
+    '                        xmlns:meta="urn:oasis:names:tc:opendocument:xmlns:meta:1.0"',
+    '                        xmlns:number="urn:oasis:names:tc:opendocument:xmlns:datastyle:1.0"',
+    '                        xmlns:svg="urn:oasis:names:tc:opendocument:xmlns:svg-compatible:1.0"',
+    '                        xmlns:chart="urn:oasis:names:tc:opendocument:xmlns:chart:1.0"',
+    '                        xmlns:dr3d="urn:oasis:names:tc:opendocument:xmlns:dr3d:1.0"',
+    '                        xmlns:math="http://www.w3.org/1998/Math/MathML"',
+    '                        xmlns:form="urn:oasis:names:tc:opendocument:xmlns:form:1.0"',
+    '                        xmlns:script="urn:oasis:names:tc:opendocument:xmlns:script:1.0"',
+    '                        xmlns:ooo="http://openoffice.org/2004/office"',
+    '                        xmlns:ooow="http://openoffice.org/2004/writer"',
+    '                        xmlns:oooc="http://openoffice.org/2004/calc"',
+    '                        xmlns:dom="http://www.w3.org/2001/xml-events"',
+    '                        xmlns:xforms="http://www.w3.org/2002/xforms"',
+    '                        xmlns:xsd="http://www.w3.org/2001/XMLSchema"',
+    '                        xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"',
+    '                        xmlns:rpt="http://openoffice.org/2005/report"',
+    '                        xmlns:of="urn:oasis:names:tc:opendocument:xmlns:of:1.2"',
+    '                        xmlns:xhtml="http://www.w3.org/1999/xhtml"',
+    '                        xmlns:grddl="http://www.w3.org/2003/g/data-view#"',
+    '                        xmlns:tableooo="http://openoffice.org/2009/table"',
+    '                        xmlns:field="urn:oasis:names:tc:opendocument:xmlns:field:1.0"',
+    '                        xmlns:formx="urn:oasis:names:tc:opendocument:xmlns:form:1.0"',
+    '                        xmlns:css3t="http://www.w3.org/TR/css3-text/"',
+    '                        office:version="1.2">',
+    '  <office:scripts/>',
+    '  <office:font-face-decls/>',
+    '  <office:automatic-styles>',
+    '    <style:style style:name="dp1" style:family="drawing-page">',
+    '      <style:drawing-page-properties draw:background-size="full" draw:fill="none"/>',
+    '    </style:style>',
+    '    <style:style style:name="gr1" style:family="graphic" style:parent-style-name="standard">',
+    '      <style:graphic-properties draw:stroke="none" draw:fill="none"/>',
+    '    </style:style>',
+    '    <style:style style:name="gr2" style:family="graphic" style:parent-style-name="standard">',
+    '      <style:graphic-properties draw:stroke="none" draw:fill="none"/>',
+    '    </style:style>',
+    '    <style:style style:name="gr3" style:family="graphic" style:parent-style-name="standard">',
+    '      <style:graphic-properties draw:stroke="none" draw:fill="none"/>',
+    '    </style:style>',
+    '    <style:style style:name="P1" style:family="paragraph" style:parent-style-name="standard">',
+    '      <style:paragraph-properties fo:text-align="center" fo:margin-top="0.423cm" fo:margin-bottom="0.212cm"/>',
+    '      <style:text-properties fo:font-size="24pt" style:font-size-asian="24pt" style:font-size-complex="24pt" fo:font-weight="bold"/>',
+    '    </style:style>',
+    '    <style:style style:name="P2" style:family="paragraph" style:parent-style-name="standard">',
+    '      <style:paragraph-properties fo:margin-top="0.212cm" fo:margin-bottom="0.212cm"/>',
+    '      <style:text-properties fo:font-size="18pt" style:font-size-asian="18pt" style:font-size-complex="18pt" fo:font-weight="bold"/>',
+    '    </style:style>',
+    '    <style:style style:name="P3" style:family="paragraph" style:parent-style-name="standard">',
+    '      <style:paragraph-properties fo:margin-top="0.106cm" fo:margin-bottom="0.106cm"/>',
+    '      <style:text-properties fo:font-size="12pt" style:font-size-asian="12pt" style:font-size-complex="12pt"/>',
+    '    </style:style>',
+    '  </office:automatic-styles>',
+    '  <office:master-styles>',
+    '    <style:master-page style:name="Standard" style:page-layout-name="AL1T0">',
+    '      <style:header/>',
+    '      <style:footer/>',
+    '    </style:master-page>',
+    '  </office:master-styles>',
+    '  <office:body>',
+    '    <office:presentation>',
+])
+
+CONTENT_XML_TAIL = '\n'.join([
+    '    </office:presentation>',
+    '  </office:body>',
+    '</office:document-content>',
+])
+
+# Maquetación de las slides: forma parte de la clave de la caché de render
+SLIDE_LAYOUT = {
+    'max_items': 8,
+    'content_top': 4.0,
+    'subtitle_step': 0.8,
+    'bullet_step': 0.5,
+    'text_step': 0.4,
+}
+
+# Incrementar al cambiar create_slide_xml_lines() o el parseo para invalidar la caché
+RENDER_VERSION = 2
+
+# Marcadores de Markdown que el parser interpreta; una barra '\' delante los deja como texto
+MARKDOWN_MARKERS = '#|-*'
+
+# Partes constantes del ODP: sus bytes comprimidos se calculan una vez por proceso
+STATIC_PARTS = ('META-INF/manifest.xml', 'styles.xml')
+
+
+class ContentItem:
+    """Elemento de contenido de una slide: subtitle, bullet, bold o text"""
+    __slots__ = ('type', 'text')
+    
+    def __init__(self, type, text):
+        self.type = type
+        self.text = text
+
+
+class Slide:
+    """Slide parseada: título, elementos y hash de su sección Markdown"""
+    __slots__ = ('title', 'content', 'source_hash')
+    
+    def __init__(self, title, content=None, source_hash=None):
+        self.title = title
+        self.content = content if content is not None else []
+        self.source_hash = source_hash
+
+
+class SlideRenderCache:
+    """Caché persistente del XML de cada slide (clave: fuente de la sección + maquetación)"""
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, source_hash):
+        """Clave de la slide: hash de su sección Markdown + versión y parámetros de render"""
+        options = {'version': RENDER_VERSION, 'layout': SLIDE_LAYOUT, 'source': source_hash}
+        payload = json.dumps(options, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, 'objects', key[:2], f'{key}.xml')
+    
+    def get(self, key):
+        """Devuelve el XML cacheado o None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8', newline='') as f:
+                xml = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return xml
+    
+    def put(self, key, xml):
+        """Guarda el XML de una slide (escritura atómica, segura entre procesos)"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.part'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(xml)
+        os.replace(tmp_path, path)
+
+
+class PackedEntry:
+    """Entrada del zip ya comprimida (deflate crudo): se escribe sin volver a comprimir"""
+    __slots__ = ('crc', 'file_size', 'raw')
+    
+    def __init__(self, crc, file_size, raw):
+        self.crc = crc
+        self.file_size = file_size
+        self.raw = raw
+
+
+def deflate_entry(data, level=None):
+    """Comprime `data` (bytes) igual que zipfile con ZIP_DEFLATED y el nivel indicado"""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, -15)
+    raw = compressor.compress(data) + compressor.flush()
+    return PackedEntry(zlib.crc32(data), len(data), raw)
+
+
+# (ruta, nivel) -> PackedEntry de las STATIC_PARTS
+_static_entries = {}
+
+
+class PreviousPackage:
+    """ODP generado anteriormente: sus entradas sin cambios se copian en crudo al nuevo"""
+    
+    def __init__(self, path):
+        # El fichero queda abierto: si otro proceso lo sustituye se sigue leyendo el mismo
+        self._fp = open(path, 'rb')
+        try:
+            with zipfile.ZipFile(self._fp) as odp_file:
+                self.entries = {info.filename: info for info in odp_file.infolist()}
+                comment = odp_file.comment
+        except Exception:
+            self._fp.close()
+            raise
+        # Comentario del zip escrito por create_odp_file(): nivel, fuente y nº de slides
+        try:
+            self.meta = json.loads(comment.decode('utf-8')) if comment else {}
+        except ValueError:
+            self.meta = {}
+    
+    @classmethod
+    def open(cls, path):
+        """Devuelve el ODP anterior o None si no existe o no es un zip válido"""
+        try:
+            return cls(path)
+        except (OSError, zipfile.BadZipFile):
+            return None
+    
+    def close(self):
+        self._fp.close()
+    
+    def get(self, arc_path, crc=None, file_size=None):
+        """PackedEntry de una entrada deflate (si coincide con crc/file_size) o None"""
+        info = self.entries.get(arc_path)
+        if info is None or info.compress_type != zipfile.ZIP_DEFLATED or info.flag_bits & 0x1:
+            return None
+        if crc is not None and (info.CRC != crc or info.file_size != file_size):
+            return None
+        # Los datos empiezan tras la cabecera local (30 bytes + nombre + extra)
+        self._fp.seek(info.header_offset)
+        header = self._fp.read(30)
+        if len(header) != 30 or header[:4] != b'PK\x03\x04':
+            return None
+        name_len, extra_len = struct.unpack('<HH', header[26:30])
+        self._fp.seek(info.header_offset + 30 + name_len + extra_len)
+        raw = self._fp.read(info.compress_size)
+        if len(raw) != info.compress_size:
+            return None
+        return PackedEntry(info.CRC, info.file_size, raw)
+
 
 class FixedManualToODPConverter:
-    def __init__(self, markdown_file, output_file):
+    def __init__(self, markdown_file, output_file, cache_dir=None, stage_hook=None, compress_level=None):
         self.markdown_file = markdown_file
         self.output_file = output_file
         self.slides = []
+        self.slide_count = 0
+        # Nivel de deflate (0-9; None = el de zlib): rápido para borradores, 9 para publicar
+        self.compress_level = compress_level
+        # Hash del Markdown de origen: permite reutilizar content.xml del ODP anterior
+        self.source_hash = None
+        # Con cache_dir solo se renderizan las slides cuya sección ha cambiado
+        self.render_cache = SlideRenderCache(cache_dir) if cache_dir else None
+        # stage_hook(etapa) -> context manager alrededor de cada etapa (medición, profiling)
+        self.stage_hook = stage_hook
+        
+    def stage(self, name):
+        """Envuelve una etapa ('parse', 'content', 'package') con el stage_hook, si lo hay"""
+        # En build() las etapas van en cadena: 'content' (y el parseo) ocurren dentro de 'package'
+        if self.stage_hook is None:
+            return contextlib.nullcontext()
+        return self.stage_hook(name)
         
     def read_markdown(self):
         """Lee el archivo markdown y lo procesa"""
@@ -28,108 +315,73 @@ class FixedManualToODPConverter:
         """Escapa caracteres especiales para XML"""
         if not text:
             return ""
-        # Escapar caracteres XML especiales
-        text = html.escape(text, quote=False)
-        # Reemplazar caracteres problemáticos
-        text = text.replace('&', '&amp;')
-        text = text.replace('<', '&lt;')
-        text = text.replace('>', '&gt;')
-        text = text.replace('"', '&quot;')
-        text = text.replace("'", '&apos;')
-        return text
+        return text.translate(XML_ESCAPES)
     
     def parse_content(self, content):
         """Parsea el contenido markdown y lo organiza en slides"""
-        lines = content.split('\n')
-        current_slide = None
-        current_content = []
+        with self.stage('parse'):
+            self.slides.extend(self.iter_slides(io.StringIO(content)))
+    
+    def iter_slides(self, lines):
+        """Tokeniza el Markdown en una sola pasada y produce cada slide al cerrar su sección"""
+        # `lines` puede ser un fichero abierto: se lee bajo demanda, línea a línea
+        slide = None
+        source = None
         
-        for line in lines:
-            line = line.strip()
+        for raw_line in lines:
+            line = raw_line.strip()
             
-            # Detectar títulos principales (##)
-            if line.startswith('## ') and not line.startswith('### '):
-                if current_slide:
-                    current_slide['content'] = current_content
-                    self.slides.append(current_slide)
-                
-                title = line[3:].strip()
+            # Detectar títulos principales (##); '### ' no empieza por '## '
+            if line.startswith('## '):
+                if slide is not None:
+                    slide.source_hash = source.hexdigest()
+                    yield slide
+                source = hashlib.sha256()
                 # Limpiar emojis y caracteres especiales para el título
-                clean_title = re.sub(r'[^\w\s\-]', '', title)
-                
-                current_slide = {
-                    'title': clean_title,
-                    'content': []
-                }
-                current_content = []
-                
-            elif current_slide and line:
-                # Procesar contenido de la slide
-                if line.startswith('### '):
-                    current_content.append({
-                        'type': 'subtitle',
-                        'text': line[4:].strip()
-                    })
-                elif line.startswith('- '):
-                    current_content.append({
-                        'type': 'bullet',
-                        'text': line[2:].strip()
-                    })
-                elif line.startswith('**') and line.endswith('**'):
-                    current_content.append({
-                        'type': 'bold',
-                        'text': line[2:-2].strip()
-                    })
-                elif line.startswith('|') and '|' in line[1:]:
-                    # Tabla - simplificar para presentación
-                    if '|' in line and not line.startswith('|---'):
-                        cells = [cell.strip() for cell in line.split('|')[1:-1]]
-                        if cells and cells[0]:  # No es línea separadora
-                            current_content.append({
-                                'type': 'text',
-                                'text': ' | '.join(cells)
-                            })
-                elif line and not line.startswith('---'):
-                    current_content.append({
-                        'type': 'text',
-                        'text': line
-                    })
+                slide = Slide(re.sub(r'[^\w\s\-]', '', line[3:].strip()))
+            
+            elif slide is not None and line:
+                # Un único despacho por el primer carácter de la línea
+                first = line[0]
+                if first == '#' and line.startswith('### '):
+                    slide.content.append(ContentItem('subtitle', line[4:].strip()))
+                elif first == '-' and line.startswith('- '):
+                    slide.content.append(ContentItem('bullet', line[2:].strip()))
+                elif first == '*' and line.startswith('**') and line.endswith('**'):
+                    slide.content.append(ContentItem('bold', line[2:-2].strip()))
+                elif first == '|' and '|' in line[1:]:
+                    # Tabla - simplificar para presentación (la separadora |--- se descarta)
+                    if not line.startswith('|---'):
+                        cells = line.split('|')[1:-1]
+                        if cells and cells[0].strip():
+                            slide.content.append(ContentItem('text', ' | '.join(cell.strip() for cell in cells)))
+                elif first == '\\' and len(line) > 1 and line[1] in MARKDOWN_MARKERS:
+                    # Marcador escapado ('\#', '\|', '\-', '\*'): texto, sin la barra
+                    slide.content.append(ContentItem('text', line[1:]))
+                elif not line.startswith('---'):
+                    slide.content.append(ContentItem('text', line))
+            
+            if source is not None:
+                # Fuente de la sección, para la caché de render por slide
+                source.update(raw_line.encode('utf-8'))
         
         # Agregar la última slide
-        if current_slide:
-            current_slide['content'] = current_content
-            self.slides.append(current_slide)
-    
-    def create_fixed_odp(self):
-        """Crea un archivo ODP con XML válido"""
-        # Crear directorio temporal
-        temp_dir = 'temp_odp_fixed'
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Crear estructura de directorios
-        os.makedirs(f'{temp_dir}/META-INF', exist_ok=True)
-        
-        # Crear mimetype
-        with open(f'{temp_dir}/mimetype', 'w', encoding='utf-8') as f:
-            f.write('application/vnd.oasis.opendocument.presentation')
-        
-        # Crear META-INF/manifest.xml
-        self.create_manifest(temp_dir)
-        
-        # Crear content.xml
-        self.create_content_xml(temp_dir)
-        
-        # Crear styles.xml
-        self.create_styles_xml(temp_dir)
-        
-        # Crear meta.xml
-        self.create_meta_xml(temp_dir)
-        
-        return temp_dir
+        if slide is not None:
+            slide.source_hash = source.hexdigest()
+            yield slide
     
-    def create_manifest(self, temp_dir):
+    def create_fixed_odp(self, slides=None):
+        """Crea en memoria las partes del ODP: [(ruta en el zip, contenido)]"""
+        # Sin directorio temporal: varias conversiones pueden ejecutarse a la vez
+        return [
+            ('META-INF/manifest.xml', self.create_manifest()),
+            # content.xml se escribe en streaming directamente en la entrada del zip
+            ('content.xml', lambda stream: self.write_content_xml(stream, slides)),
+            ('styles.xml', self.create_styles_xml()),
+            ('meta.xml', self.create_meta_xml()),
+        ]
+    
+    def create_manifest(self):
         """Crea el archivo manifest.xml"""
         manifest_content = '''<?xml version="1.0" encoding="UTF-8"?>
 <manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0">
@@ -139,104 +391,54 @@ class FixedManualToODPConverter:
   <manifest:file-entry manifest:full-path="meta.xml" manifest:media-type="text/xml"/>
 </manifest:manifest>'''
         
-        with open(f'{temp_dir}/META-INF/manifest.xml', 'w', encoding='utf-8') as f:
-            f.write(manifest_content)
+        return manifest_content
     
-    def create_content_xml(self, temp_dir):
+    def create_content_xml(self):
         """Crea el archivo content.xml con XML válido"""
-        content_lines = [
-            '<?xml version="1.0" encoding="UTF-8"?>',
-            '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"',
-            '                        xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0"',
-            '                        xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"',
-            '                        xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"',
-            '                        xmlns:draw="urn:oasis:names:tc:opendocument:xmlns:drawing:1.0"',
-            '                        xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0"',
-            '                        xmlns:xlink="http://www.w3.org/1999/xlink"',
-            '                        xmlns:dc="http://purl.org/dc/elements/1.1/"',
-            '                        xmlns:meta="urn:oasis:names:tc:opendocument:xmlns:meta:1.0"',
-            '                        xmlns:number="urn:oasis:names:tc:opendocument:xmlns:datastyle:1.0"',
-            '                        xmlns:svg="urn:oasis:names:tc:opendocument:xmlns:svg-compatible:1.0"',
-            '                        xmlns:chart="urn:oasis:names:tc:opendocument:xmlns:chart:1.0"',
-            '                        xmlns:dr3d="urn:oasis:names:tc:opendocument:xmlns:dr3d:1.0"',
-            '                        xmlns:math="http://www.w3.org/1998/Math/MathML"',
-            '                        xmlns:form="urn:oasis:names:tc:opendocument:xmlns:form:1.0"',
-            '                        xmlns:script="urn:oasis:names:tc:opendocument:xmlns:script:1.0"',
-            '                        xmlns:ooo="http://openoffice.org/2004/office"',
-            '                        xmlns:ooow="http://openoffice.org/2004/writer"',
-            '                        xmlns:oooc="http://openoffice.org/2004/calc"',
-            '                        xmlns:dom="http://www.w3.org/2001/xml-events"',
-            '                        xmlns:xforms="http://www.w3.org/2002/xforms"',
-            '                        xmlns:xsd="http://www.w3.org/2001/XMLSchema"',
-            '                        xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"',
-            '                        xmlns:rpt="http://openoffice.org/2005/report"',
-            '                        xmlns:of="urn:oasis:names:tc:opendocument:xmlns:of:1.2"',
-            '                        xmlns:xhtml="http://www.w3.org/1999/xhtml"',
-            '                        xmlns:grddl="http://www.w3.org/2003/g/data-view#"',
-            '                        xmlns:tableooo="http://openoffice.org/2009/table"',
-            '                        xmlns:field="urn:oasis:names:tc:opendocument:xmlns:field:1.0"',
-            '                        xmlns:formx="urn:oasis:names:tc:opendocument:xmlns:form:1.0"',
-            '                        xmlns:css3t="http://www.w3.org/TR/css3-text/"',
-            '                        office:version="1.2">',
-            '  <office:scripts/>',
-            '  <office:font-face-decls/>',
-            '  <office:automatic-styles>',
-            '    <style:style style:name="dp1" style:family="drawing-page">',
-            '      <style:drawing-page-properties draw:background-size="full" draw:fill="none"/>',
-            '    </style:style>',
-            '    <style:style style:name="gr1" style:family="graphic" style:parent-style-name="standard">',
-            '      <style:graphic-properties draw:stroke="none" draw:fill="none"/>',
-            '    </style:style>',
-            '    <style:style style:name="gr2" style:family="graphic" style:parent-style-name="standard">',
-            '      <style:graphic-properties draw:stroke="none" draw:fill="none"/>',
-            '    </style:style>',
-            '    <style:style style:name="gr3" style:family="graphic" style:parent-style-name="standard">',
-            '      <style:graphic-properties draw:stroke="none" draw:fill="none"/>',
-            '    </style:style>',
-            '    <style:style style:name="P1" style:family="paragraph" style:parent-style-name="standard">',
-            '      <style:paragraph-properties fo:text-align="center" fo:margin-top="0.423cm" fo:margin-bottom="0.212cm"/>',
-            '      <style:text-properties fo:font-size="24pt" style:font-size-asian="24pt" style:font-size-complex="24pt" fo:font-weight="bold"/>',
-            '    </style:style>',
-            '    <style:style style:name="P2" style:family="paragraph" style:parent-style-name="standard">',
-            '      <style:paragraph-properties fo:margin-top="0.212cm" fo:margin-bottom="0.212cm"/>',
-            '      <style:text-properties fo:font-size="18pt" style:font-size-asian="18pt" style:font-size-complex="18pt" fo:font-weight="bold"/>',
-            '    </style:style>',
-            '    <style:style style:name="P3" style:family="paragraph" style:parent-style-name="standard">',
-            '      <style:paragraph-properties fo:margin-top="0.106cm" fo:margin-bottom="0.106cm"/>',
-            '      <style:text-properties fo:font-size="12pt" style:font-size-asian="12pt" style:font-size-complex="12pt"/>',
-            '    </style:style>',
-            '  </office:automatic-styles>',
-            '  <office:master-styles>',
-            '    <style:master-page style:name="Standard" style:page-layout-name="AL1T0">',
-            '      <style:header/>',
-            '      <style:footer/>',
-            '    </style:master-page>',
-            '  </office:master-styles>',
-            '  <office:body>',
-            '    <office:presentation>'
-        ]
-        
-        # Agregar slides
-        for i, slide in enumerate(self.slides):
-            content_lines.extend(self.create_slide_xml_lines(slide, i))
-        
-        content_lines.extend([
-            '    </office:presentation>',
-            '  </office:body>',
-            '</office:document-content>'
-        ])
+        buffer = io.StringIO()
+        self.write_content_xml(buffer)
+        return buffer.getvalue()
+    
+    def write_content_xml(self, stream, slides=None):
+        """Escribe content.xml slide a slide en un stream de texto"""
+        # La memoria no depende del número de slides: cada una se escribe y se descarta.
+        # `slides` puede ser el generador de iter_slides(): parseo y escritura en cadena
+        self.slide_count = 0
+        with self.stage('content'):
+            stream.write(CONTENT_XML_HEAD)
+            for i, slide in enumerate(self.slides if slides is None else slides):
+                stream.write('\n')
+                stream.write(self.create_slide_xml(slide, i))
+                self.slide_count = i + 1
+            stream.write('\n')
+            stream.write(CONTENT_XML_TAIL)
+    
+    def create_slide_xml(self, slide_data, slide_number):
+        """Crea el XML de una slide, reutilizando la caché de render si existe"""
+        if self.render_cache is None or slide_data.source_hash is None:
+            return '\n'.join(self.create_slide_xml_lines(slide_data, slide_number))
         
-        with open(f'{temp_dir}/content.xml', 'w', encoding='utf-8') as f:
-            f.write('\n'.join(content_lines))
+        # Se cachea la slide sin su línea <draw:page>, la única que depende de la
+        # posición: insertar una sección no invalida las slides siguientes
+        key = self.render_cache.key(slide_data.source_hash)
+        body = self.render_cache.get(key)
+        if body is None:
+            body = '\n'.join(self.create_slide_xml_lines(slide_data, slide_number)[1:])
+            self.render_cache.put(key, body)
+        return f'{self.page_open_line(slide_number)}\n{body}'
+    
+    def page_open_line(self, slide_number):
+        """Línea de apertura <draw:page> de una slide"""
+        return f'      <draw:page draw:name="Slide{slide_number + 1}" draw:style-name="dp1" draw:master-page-name="Standard">'
     
     def create_slide_xml_lines(self, slide_data, slide_number):
         """Crea líneas XML para una slide individual"""
         lines = []
         
         # Escapar el título
-        escaped_title = self.escape_xml(slide_data['title'])
+        escaped_title = self.escape_xml(slide_data.title)
         
-        lines.append(f'      <draw:page draw:name="Slide{slide_number + 1}" draw:style-name="dp1" draw:master-page-name="Standard">')
+        lines.append(self.page_open_line(slide_number))
         
         # Título de la slide
         lines.append(f'        <draw:frame draw:style-name="gr1" draw:text-style-name="P1" draw:layer="layout" svg:width="25.199cm" svg:height="3.506cm" svg:x="1.4cm" svg:y="0.3cm">')
@@ -246,20 +448,20 @@ class FixedManualToODPConverter:
         lines.append('        </draw:frame>')
         
         # Agregar contenido
-        content_y = 4.0
+        content_y = SLIDE_LAYOUT['content_top']
         content_count = 0
-        for content_item in slide_data['content']:
-            if content_count >= 8:  # Limitar contenido por slide
+        for content_item in slide_data.content:
+            if content_count >= SLIDE_LAYOUT['max_items']:  # Limitar contenido por slide
                 break
             
             # Verificar que el contenido tenga texto
-            if 'text' not in content_item or not content_item['text']:
+            if not content_item.text:
                 continue
                 
-            escaped_text = self.escape_xml(content_item['text'])
+            escaped_text = self.escape_xml(content_item.text)
             
-            if content_item['type'] == 'subtitle':
-                content_y += 0.8
+            if content_item.type == 'subtitle':
+                content_y += SLIDE_LAYOUT['subtitle_step']
                 lines.append(f'        <draw:frame draw:style-name="gr2" draw:text-style-name="P2" draw:layer="layout" svg:width="25.199cm" svg:height="0.6cm" svg:x="1.4cm" svg:y="{content_y:.1f}cm">')
                 lines.append('          <draw:text-box>')
                 lines.append(f'            <text:p text:style-name="P2">{escaped_text}</text:p>')
@@ -267,8 +469,8 @@ class FixedManualToODPConverter:
                 lines.append('        </draw:frame>')
                 content_count += 1
                 
-            elif content_item['type'] == 'bullet':
-                content_y += 0.5
+            elif content_item.type == 'bullet':
+                content_y += SLIDE_LAYOUT['bullet_step']
                 lines.append(f'        <draw:frame draw:style-name="gr3" draw:text-style-name="P3" draw:layer="layout" svg:width="25.199cm" svg:height="0.5cm" svg:x="2.0cm" svg:y="{content_y:.1f}cm">')
                 lines.append('          <draw:text-box>')
                 lines.append(f'            <text:p text:style-name="P3">• {escaped_text}</text:p>')
@@ -276,8 +478,8 @@ class FixedManualToODPConverter:
                 lines.append('        </draw:frame>')
                 content_count += 1
                 
-            elif content_item['type'] == 'text':
-                content_y += 0.4
+            elif content_item.type == 'text':
+                content_y += SLIDE_LAYOUT['text_step']
                 lines.append(f'        <draw:frame draw:style-name="gr3" draw:text-style-name="P3" draw:layer="layout" svg:width="25.199cm" svg:height="0.4cm" svg:x="1.4cm" svg:y="{content_y:.1f}cm">')
                 lines.append('          <draw:text-box>')
                 lines.append(f'            <text:p text:style-name="P3">{escaped_text}</text:p>')
@@ -288,7 +490,7 @@ class FixedManualToODPConverter:
         lines.append('      </draw:page>')
         return lines
     
-    def create_styles_xml(self, temp_dir):
+    def create_styles_xml(self):
         """Crea el archivo styles.xml"""
         styles_content = '''<?xml version="1.0" encoding="UTF-8"?>
 <office:document-styles xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" 
@@ -328,10 +530,9 @@ class FixedManualToODPConverter:
   <office:master-styles/>
 </office:document-styles>'''
         
-        with open(f'{temp_dir}/styles.xml', 'w', encoding='utf-8') as f:
-            f.write(styles_content)
+        return styles_content
     
-    def create_meta_xml(self, temp_dir):
+    def create_meta_xml(self):
         """Crea el archivo meta.xml"""
         meta_content = f'''<?xml version="1.0" encoding="UTF-8"?>
 <office:document-meta xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" 
@@ -347,55 +548,339 @@ class FixedManualToODPConverter:
   </office:meta>
 </office:document-meta>'''
         
-        with open(f'{temp_dir}/meta.xml', 'w', encoding='utf-8') as f:
-            f.write(meta_content)
-    
-    def create_odp_file(self, temp_dir):
-        """Crea el archivo .odp final"""
-        with zipfile.ZipFile(self.output_file, 'w', zipfile.ZIP_DEFLATED) as odp_file:
-            # Agregar mimetype sin comprimir
-            odp_file.write(f'{temp_dir}/mimetype', 'mimetype')
-            
-            # Agregar resto de archivos
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    if file != 'mimetype':
-                        file_path = os.path.join(root, file)
-                        arc_path = os.path.relpath(file_path, temp_dir)
-                        odp_file.write(file_path, arc_path)
-    
-    def cleanup(self, temp_dir):
-        """Limpia archivos temporales"""
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-    
-    def convert(self):
-        """Ejecuta la conversión completa"""
-        print("Leyendo archivo markdown...")
-        content = self.read_markdown()
+        return meta_content
+    
+    def create_odp_file(self, parts, previous=None):
+        """Crea el archivo .odp final a partir de las partes en memoria"""
+        # Se escribe en un temporal y se renombra: LibreOffice nunca ve un .odp a medias
+        # y, si la conversión falla, se conserva el anterior
+        tmp_path = f'{self.output_file}.{os.getpid()}.part'
+        # Las entradas del ODP anterior solo sirven si se comprimieron con el mismo nivel
+        if previous is not None and previous.meta.get('level', -1) != self.compress_level:
+            previous = None
+        try:
+            with self.stage('package'), zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED,
+                                                        compresslevel=self.compress_level) as odp_file:
+                # ODF exige mimetype como primera entrada y sin comprimir
+                odp_file.writestr(zipfile.ZipInfo('mimetype'), MIMETYPE, compress_type=zipfile.ZIP_STORED)
+                
+                # Agregar resto de partes (texto, función que escribe en un stream o PackedEntry)
+                for arc_path, data in parts:
+                    if callable(data):
+                        with odp_file.open(arc_path, 'w') as entry:
+                            stream = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+                            data(stream)
+                            stream.flush()
+                            stream.detach()
+                    else:
+                        if not isinstance(data, PackedEntry):
+                            data = self.pack_part(arc_path, data.encode('utf-8'), previous)
+                        self.write_packed(odp_file, arc_path, data)
+                
+                odp_file.comment = json.dumps({
+                    'level': self.compress_level,
+                    'source': self.source_hash,
+                    'slides': self.slide_count,
+                }).encode('utf-8')
+            os.replace(tmp_path, self.output_file)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def pack_part(self, arc_path, data, previous=None):
+        """Bytes comprimidos de una parte: caché de partes constantes, ODP anterior o deflate"""
+        static = arc_path in STATIC_PARTS
+        if static:
+            packed = _static_entries.get((arc_path, self.compress_level))
+            if packed is not None and packed.file_size == len(data) and packed.crc == zlib.crc32(data):
+                return packed
+        packed = previous.get(arc_path, zlib.crc32(data), len(data)) if previous is not None else None
+        if packed is None:
+            packed = deflate_entry(data, self.compress_level)
+        if static:
+            _static_entries[(arc_path, self.compress_level)] = packed
+        return packed
+    
+    def write_packed(self, odp_file, arc_path, packed):
+        """
+        Añade una entrada ya comprimida al zip, copiando sus bytes sin recomprimir.
         
-        print("Parseando contenido...")
-        self.parse_content(content)
+        zipfile no tiene API pública para escribir datos ya comprimidos, así que se
+        replica lo que hacen writestr() y ZipFile.open('w') con la cabecera completa.
+        Depende de atributos internos de ZipFile en CPython (fp, start_dir, filelist,
+        NameToInfo, _writing): si cambian entre versiones, esto debe revisarse.
+        """
+        # Con un ZipFile.open('w') abierto, start_dir aún no apunta al final de su
+        # entrada y se sobrescribiría: mejor fallar que dejar un zip corrupto
+        if odp_file._writing:
+            raise RuntimeError(f"No se puede añadir {arc_path}: hay otra entrada del zip abierta para escritura")
+        zinfo = zipfile.ZipInfo(arc_path, date_time=time.localtime(time.time())[:6])
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.external_attr = 0o600 << 16
+        zinfo.CRC = packed.crc
+        zinfo.file_size = packed.file_size
+        zinfo.compress_size = len(packed.raw)
+        odp_file.fp.seek(odp_file.start_dir)
+        zinfo.header_offset = odp_file.fp.tell()
+        odp_file.fp.write(zinfo.FileHeader())
+        odp_file.fp.write(packed.raw)
+        odp_file.start_dir = odp_file.fp.tell()
+        odp_file.filelist.append(zinfo)
+        odp_file.NameToInfo[arc_path] = zinfo
+    
+    def build(self):
+        """Parsea y escribe el ODP en cadena, leyendo el Markdown bajo demanda. Devuelve el nº de slides"""
+        self.source_hash = self.source_fingerprint()
+        previous = PreviousPackage.open(self.output_file)
+        try:
+            # Markdown sin cambios: content.xml se copia del ODP anterior sin parsear ni comprimir
+            if previous is not None and previous.meta.get('source') == self.source_hash \
+                    and previous.meta.get('level', -1) == self.compress_level and previous.meta.get('slides'):
+                content = previous.get('content.xml')
+                if content is not None:
+                    self.slide_count = previous.meta['slides']
+                    parts = [(arc_path, content if arc_path == 'content.xml' else data)
+                             for arc_path, data in self.create_fixed_odp()]
+                    self.create_odp_file(parts, previous)
+                    return self.slide_count
+            with open(self.markdown_file, 'r', encoding='utf-8') as f:
+                return self.build_lines(f, previous)
+        finally:
+            if previous is not None:
+                previous.close()
+    
+    def source_fingerprint(self):
+        """Hash del Markdown y de todo lo que determina content.xml (versión y maquetación)"""
+        digest = hashlib.sha256(json.dumps({'version': RENDER_VERSION, 'layout': SLIDE_LAYOUT}, sort_keys=True).encode('utf-8'))
+        with open(self.markdown_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def build_lines(self, lines, previous=None):
+        """Como build(), con el Markdown de un iterable de líneas (p. ej. generado en streaming)"""
+        slides = self.iter_slides(lines)
+        # Sin secciones '## ' no se genera el ODP
+        first = next(slides, None)
+        if first is None:
+            return 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_file)), exist_ok=True)
+        self.create_odp_file(self.create_fixed_odp(itertools.chain([first], slides)), previous)
+        return self.slide_count
+    
+    def convert(self, verbose=True):
+        """Ejecuta la conversión completa"""
+        log = print if verbose else (lambda *args: None)
+        log("Leyendo y parseando archivo markdown...")
+        log("Generando archivo ODP...")
+        n_slides = self.build()
         
-        print(f"Se encontraron {len(self.slides)} slides")
+        log(f"Se encontraron {n_slides} slides")
+        if not n_slides:
+            log("Sin secciones '## ': no se genera el ODP")
+            return
         
-        print("Creando estructura ODP corregida...")
-        temp_dir = self.create_fixed_odp()
+        if self.render_cache is not None:
+            cache = self.render_cache
+            log(f"Slides reutilizadas de caché: {cache.hits}/{cache.hits + cache.misses}")
         
-        print("Generando archivo ODP...")
-        self.create_odp_file(temp_dir)
+        log(f"Conversión completada: {self.output_file}")
+
+def _is_markdown(path):
+    return path.lower().endswith(('.md', '.markdown'))
+
+def _glob_root(pattern):
+    # Prefijo del patrón sin comodines: raíz respecto a la que se replica el árbol
+    parts = []
+    for part in pattern.replace(os.sep, '/').split('/'):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return '/'.join(parts) or '.'
+
+def expand_inputs(inputs, excludes=()):
+    """Expande rutas, carpetas (recursivo) y patrones glob a [(md_path, rel_path o None)]"""
+    found = []
+    seen = set()
+    
+    def add(path, rel_path):
+        key = os.path.abspath(path)
+        if key in seen:
+            return
+        if rel_path is not None and any(fnmatch.fnmatch(rel_path.replace(os.sep, '/'), pattern) for pattern in excludes):
+            return
+        seen.add(key)
+        found.append((path, rel_path))
+    
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                # Sin carpetas ocultas (.git, .github...)
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                for name in sorted(files):
+                    if _is_markdown(name):
+                        path = os.path.join(root, name)
+                        add(path, os.path.relpath(path, item))
+        elif glob.has_magic(item):
+            root = _glob_root(item)
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path) and _is_markdown(path):
+                    add(path, os.path.relpath(path, root))
+        else:
+            add(item, None)
+    return found
+
+def derive_output_path(md_path, out_dir, rel_path=None):
+    """Ruta del .odp: junto a la entrada (Markdown o PDF), o bajo out_dir replicando el árbol de origen"""
+    if out_dir and rel_path:
+        return os.path.join(out_dir, f'{os.path.splitext(rel_path)[0]}.odp')
+    base_name = os.path.splitext(os.path.basename(md_path))[0]
+    out_dir = out_dir or os.path.dirname(os.path.abspath(md_path))
+    return os.path.join(out_dir, f'{base_name}.odp')
+
+def plan_jobs(entries, out=None, out_dir=None):
+    """Empareja cada entrada (Markdown o PDF) con su .odp de salida: [(ruta, out_path)]"""
+    jobs = []
+    for md_path, rel_path in entries:
+        if len(entries) == 1 and rel_path is None and out:
+            jobs.append((md_path, out))
+        else:
+            jobs.append((md_path, derive_output_path(md_path, out_dir, rel_path)))
+    return jobs
+
+def snapshot_inputs(inputs, excludes=()):
+    """Firma barata (tamaño, mtime_ns) de cada Markdown de las entradas, para --watch"""
+    snapshot = {}
+    for path, _rel in expand_inputs(inputs, excludes):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snapshot[path] = (st.st_size, st.st_mtime_ns)
+    return snapshot
+
+def watch_inputs(inputs, on_change, excludes=(), interval=0.5, debounce=0.5):
+    """
+    Sondea las entradas y llama a on_change() con los Markdown nuevos o modificados.
+    
+    Solo se comparan firmas (tamaño, mtime). Una ráfaga de guardados se agrupa en
+    una única regeneración: un fichero se entrega cuando su firma lleva `debounce`
+    segundos sin cambiar. Bucle infinito: se interrumpe con KeyboardInterrupt.
+    """
+    known = snapshot_inputs(inputs, excludes)
+    pending = {}  # ruta -> (firma, instante en que se vio por primera vez)
+    while True:
+        time.sleep(interval)
+        now = time.monotonic()
+        current = snapshot_inputs(inputs, excludes)
+        for path, sig in current.items():
+            if known.get(path) == sig:
+                # Volvió a la versión ya generada (p. ej. deshacer y guardar)
+                pending.pop(path, None)
+            elif pending.get(path, (None,))[0] != sig:
+                pending[path] = (sig, now)
+        # Los Markdown borrados se olvidan: si reaparecen se tratan como nuevos
+        pending = {path: entry for path, entry in pending.items() if path in current}
+        known = {path: sig for path, sig in known.items() if path in current}
+        ready = [path for path, (sig, seen) in pending.items() if now - seen >= debounce]
+        if ready:
+            for path in ready:
+                known[path] = pending.pop(path)[0]
+            on_change(ready)
+
+def convert_file(md_path, out_path, cache_dir=None, compress_level=None):
+    """Convierte un Markdown. Devuelve (estado, mensaje): estado es 'OK', 'OMITIDO' o 'ERROR'"""
+    # Punto de entrada de los workers: nunca debe propagar excepciones
+    if not os.path.isfile(md_path):
+        return 'ERROR', f'No existe el archivo Markdown: {md_path}'
+    try:
+        n_slides = FixedManualToODPConverter(md_path, out_path, cache_dir, compress_level=compress_level).build()
+    except Exception as e:
+        return 'ERROR', str(e)
+    if not n_slides:
+        return 'OMITIDO', "Sin secciones '## '"
+    return 'OK', f'{out_path} ({n_slides} slides)'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convertir Markdown a presentaciones ODP (LibreOffice Impress)")
+    parser.add_argument('inputs', nargs='+', help='Ficheros Markdown, carpetas o patrones glob')
+    parser.add_argument('--out', dest='out', help='Ruta de salida (si un único Markdown)')
+    parser.add_argument('--out-dir', dest='out_dir', help='Directorio de salida (replica el árbol de origen)')
+    parser.add_argument('--jobs', dest='jobs', type=int, default=1, help='Procesos en paralelo (0 = todos los núcleos)')
+    parser.add_argument('--cache-dir', dest='cache_dir', default=None, help='Caché de render por slide')
+    parser.add_argument('--exclude', dest='excludes', action='append', default=[],
+                        help='Patrón de rutas a excluir (relativo a la carpeta o patrón); repetible')
+    parser.add_argument('--compress-level', dest='compress_level', type=int, choices=range(10), default=None, metavar='N',
+                        help='Nivel de compresión 0-9 (1 = borradores rápidos, 9 = publicación; por defecto el de zlib)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Tras la pasada inicial, vigila los Markdown y regenera solo los decks que cambien')
+    parser.add_argument('--watch-interval', dest='watch_interval', type=float, default=0.5,
+                        help='Segundos entre sondeos en modo --watch (por defecto 0.5)')
+    parser.add_argument('--debounce', dest='debounce', type=float, default=0.5,
+                        help='Segundos sin cambios antes de regenerar tras un guardado (por defecto 0.5)')
+    args = parser.parse_args(argv)
+    
+    entries = expand_inputs(args.inputs, args.excludes)
+    if not entries:
+        print("[ERROR] No se encontraron Markdown en las entradas indicadas", file=sys.stderr)
+        return 1
+    if len(entries) > 1 and args.out:
+        print("[AVISO] --out se ignora con múltiples Markdown; usa --out-dir", file=sys.stderr)
+    
+    jobs = plan_jobs(entries, args.out, args.out_dir)
+    
+    n_jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    n_jobs = min(n_jobs, len(jobs))
+    md_paths = [md_path for md_path, _ in jobs]
+    out_paths = [out_path for _, out_path in jobs]
+    cache_dirs = [args.cache_dir] * len(jobs)
+    levels = [args.compress_level] * len(jobs)
+    
+    counts = {'OK': 0, 'OMITIDO': 0, 'ERROR': 0}
+    
+    def report(results):
+        # Resultados en el orden de entrada, según van llegando
+        for md_path, (status, msg) in zip(md_paths, results):
+            counts[status] += 1
+            print(f"[{status}] {md_path} -> {msg}", flush=True)
+    
+    if n_jobs <= 1:
+        report(map(convert_file, md_paths, out_paths, cache_dirs, levels))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
         
-        print("Limpiando archivos temporales...")
-        self.cleanup(temp_dir)
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            # Documentos pequeños: se reparten en lotes para amortizar la comunicación
+            chunksize = max(1, len(jobs) // (n_jobs * 8))
+            report(executor.map(convert_file, md_paths, out_paths, cache_dirs, levels, chunksize=chunksize))
+    
+    print(f"Resumen: {counts['OK']} convertidos, {counts['OMITIDO']} omitidos, {counts['ERROR']} con error")
+    
+    if args.watch:
+        def on_change(paths):
+            # Solo se regeneran los decks de los Markdown modificados
+            changed = set(paths)
+            entries = expand_inputs(args.inputs, args.excludes)
+            for md_path, out_path in plan_jobs(entries, args.out, args.out_dir):
+                if md_path not in changed:
+                    continue
+                started = time.monotonic()
+                status, msg = convert_file(md_path, out_path, args.cache_dir, args.compress_level)
+                elapsed = time.monotonic() - started
+                # Latencia percibida: desde el último guardado hasta el .odp listo
+                try:
+                    since_save = time.time() - os.stat(md_path).st_mtime
+                except OSError:
+                    since_save = elapsed
+                print(f"[{status}] {md_path} -> {msg} en {elapsed * 1000:.0f} ms ({since_save * 1000:.0f} ms desde el guardado)", flush=True)
         
-        print(f"Conversión completada: {self.output_file}")
-
-def main():
-    input_file = '/home/christian/Escritorio/Verial/Manual_Usuario_Dashboard.md'
-    output_file = '/home/christian/Escritorio/Verial/Manual_Usuario_Dashboard.odp'
+        print(f"[WATCH] Vigilando {len(args.inputs)} entrada(s); Ctrl+C para salir", file=sys.stderr)
+        try:
+            watch_inputs(args.inputs, on_change, args.excludes, args.watch_interval, args.debounce)
+        except KeyboardInterrupt:
+            return 0
     
-    converter = FixedManualToODPConverter(input_file, output_file)
-    converter.convert()
+    return 1 if counts['ERROR'] else 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
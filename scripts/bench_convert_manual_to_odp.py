@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de rendimiento de convert_manual_to_odp.py
+
+Genera Markdown sintético (secciones, subtítulos, viñetas, tablas, líneas en
+negrita y caracteres a escapar) con varias formas de documento y mide cada
+etapa del conversor por separado mediante su stage_hook:
+
+  parse     parse_content(): tokenizado del Markdown a slides
+  content   write_content_xml(): generación de content.xml (en memoria)
+  package   create_odp_file(): compresión y escritura del zip
+
+Además mide la conversión en cadena (build(), que es lo que usa la CLI) en un
+proceso nuevo para obtener su pico de memoria y el tamaño del .odp, y la
+regeneración con el Markdown sin cambios (repack: partes copiadas del .odp
+anterior), y lo compara todo con una baseline guardada.
+
+Uso básico:
+  python scripts/bench_convert_manual_to_odp.py
+
+Opciones:
+  --scale 0.25         Escala el tamaño de los documentos (ejecuciones rápidas)
+  --repeat N           Repeticiones por caso; se toma el mejor tiempo (por defecto 3)
+  --baseline FILE      Baseline a comparar (por defecto bench_convert_manual_to_odp.baseline.json)
+  --tolerance 0.25     Margen permitido antes de considerar una regresión
+  --update-baseline    Guarda los resultados actuales en la baseline (se fusionan con los existentes)
+  --profile DIR        Guarda un perfil cProfile (.pstats) por caso y etapa (no se compara con la baseline)
+  --json out.json      Guarda los resultados en JSON
+  --keep DIR           Conserva los Markdown y ODP generados en DIR
+
+Código de salida: 0 sin regresiones; 1 si algún caso empeora más que la tolerancia.
+La baseline depende de la máquina: regenérala con --update-baseline en el host de referencia.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_convert_manual_to_odp.baseline.json')
+
+WORDS = (
+    "articulo stock precio cliente pedido factura albaran almacen proveedor sincronizacion "
+    "categoria referencia descripcion importe iva descuento tarifa unidad familia fabricante "
+    "verial woocommerce producto imagen pagina campo sesion usuario fecha codigo"
+).split()
+# Texto con caracteres que el conversor tiene que escapar
+SPECIAL = ["memoria > 80%", "tasa < 60%", "I+D & soporte", "'default' => 'Por Defecto'", '"dark"']
+
+STAGES = ('parse', 'content', 'package')
+# Diferencia mínima para contar un tiempo como regresión: las etapas cortas son ruidosas
+MIN_DELTA_S = 0.02
+
+
+# --- Generación de Markdown sintético ---
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    if rng.random() < 0.1:
+        words.append(rng.choice(SPECIAL))
+    return ' '.join(words)
+
+
+def _section(rng: random.Random, index: int, subtitles: int, bullets: int, table_rows: int, texts: int) -> List[str]:
+    lines = [f"## {index}. {_sentence(rng, 3).title()} 🚀", ""]
+    for _ in range(subtitles):
+        lines += [f"### {_sentence(rng, 4)}", ""]
+        lines += [f"- **{rng.choice(WORDS)}**: {_sentence(rng, 8)}" for _ in range(bullets)]
+        lines += ["", f"**{_sentence(rng, 5)}**", ""]
+    if table_rows:
+        lines += ["| Referencia | Descripción | Precio | Stock | Estado |", "|---|---|---|---|---|"]
+        lines += [
+            f"| REF{rng.randrange(100000):05d} | {_sentence(rng, 4)} | {rng.uniform(0, 999):.2f} | "
+            f"{rng.randrange(500)} | {rng.choice(['activo', 'baja', 'pendiente'])} |"
+            for _ in range(table_rows)
+        ]
+        lines.append("")
+    lines += [_sentence(rng, 12) for _ in range(texts)]
+    lines += ["", "---", ""]
+    return lines
+
+
+def _shape_manual(rng: random.Random, scale: float) -> Iterator[List[str]]:
+    # Como Manual_Usuario_Dashboard.md: subtítulos, viñetas y algo de texto
+    for i in range(max(1, int(400 * scale))):
+        yield _section(rng, i, subtitles=2, bullets=4, table_rows=0, texts=3)
+
+
+def _shape_catalogue(rng: random.Random, scale: float) -> Iterator[List[str]]:
+    # Catálogo de productos: una tabla por sección
+    for i in range(max(1, int(1500 * scale))):
+        yield _section(rng, i, subtitles=0, bullets=0, table_rows=20, texts=1)
+
+
+def _shape_changelog(rng: random.Random, scale: float) -> Iterator[List[str]]:
+    # Changelog: muchas secciones cortas con viñetas
+    for i in range(max(1, int(4000 * scale))):
+        yield _section(rng, i, subtitles=1, bullets=6, table_rows=0, texts=0)
+
+
+def _shape_long_sections(rng: random.Random, scale: float) -> Iterator[List[str]]:
+    # Pocas secciones muy largas: se parsea todo aunque solo se muestren 8 elementos
+    for i in range(10):
+        yield _section(rng, i, subtitles=max(1, int(300 * scale)), bullets=10, table_rows=100, texts=50)
+
+
+SHAPES: Dict[str, Callable[[random.Random, float], Iterator[List[str]]]] = {
+    'manual': _shape_manual,
+    'catalogue': _shape_catalogue,
+    'changelog': _shape_changelog,
+    'long_sections': _shape_long_sections,
+}
+
+
+def generate_corpus(work_dir: str, scale: float = 1.0, seed: int = 1234) -> Dict[str, Tuple[str, int]]:
+    """Genera un Markdown por forma en work_dir. Devuelve {forma: (ruta, nº de secciones)}."""
+    corpus = {}
+    for name, shape in SHAPES.items():
+        rng = random.Random(f"{seed}:{name}")
+        path = os.path.join(work_dir, f"{name}.md")
+        sections = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# Documento sintético: {name}\n\n")
+            for lines in shape(rng, scale):
+                f.write('\n'.join(lines))
+                f.write('\n')
+                sections += 1
+        corpus[name] = (path, sections)
+    return corpus
+
+
+# --- Ejecución ---
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def timing_hook(timings: Dict[str, float], profile_prefix: Optional[str] = None) -> Callable[[str], Any]:
+    """
+    stage_hook para FixedManualToODPConverter que acumula el tiempo de cada etapa
+    en `timings` y, con `profile_prefix`, guarda un perfil <prefijo>.<etapa>.pstats.
+    """
+    @contextlib.contextmanager
+    def hook(stage: str) -> Iterator[None]:
+        profiler = None
+        if profile_prefix:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(f"{profile_prefix}.{stage}.pstats")
+
+    return hook
+
+
+def _run_staged(md_path: str, out_path: str, profile_prefix: Optional[str]) -> Dict[str, Any]:
+    # Etapas por separado: content.xml se genera entero en memoria antes de empaquetar
+    from convert_manual_to_odp import FixedManualToODPConverter
+
+    timings: Dict[str, float] = {}
+    converter = FixedManualToODPConverter(md_path, out_path, stage_hook=timing_hook(timings, profile_prefix))
+    converter.parse_content(converter.read_markdown())
+    content_xml = converter.create_content_xml()
+    parts = [(name, content_xml if name == 'content.xml' else data) for name, data in converter.create_fixed_odp()]
+    converter.create_odp_file(parts)
+    return {
+        **{f"{stage}_s": timings.get(stage, 0.0) for stage in STAGES},
+        'slides': len(converter.slides),
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+
+
+def _run_pipeline(md_path: str, out_path: str) -> Dict[str, Any]:
+    # Conversión en cadena (la de la CLI) en un proceso nuevo: su pico de RSS es solo suyo
+    from convert_manual_to_odp import FixedManualToODPConverter
+
+    # Sin .odp anterior: se mide la conversión completa, no la reutilización
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    started = time.perf_counter()
+    slides = FixedManualToODPConverter(md_path, out_path).build()
+    wall_s = time.perf_counter() - started
+    odp_bytes = os.path.getsize(out_path)
+
+    # Regenerar con el Markdown sin cambios: las partes se copian del .odp anterior
+    started = time.perf_counter()
+    FixedManualToODPConverter(md_path, out_path).build()
+    return {
+        'wall_s': wall_s,
+        'repack_s': time.perf_counter() - started,
+        'slides': slides,
+        'peak_rss_kb': _peak_rss_kb(),
+        'odp_bytes': odp_bytes,
+    }
+
+
+def _in_new_process(fn: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(fn, *args).result()
+
+
+def run_benchmarks(
+    corpus: Dict[str, Tuple[str, int]],
+    work_dir: str,
+    repeat: int = 3,
+    profile_dir: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, (md_path, sections) in corpus.items():
+        out_path = os.path.join(work_dir, f"{name}.odp")
+        staged = []
+        pipeline = []
+        for i in range(max(1, repeat)):
+            # Con --profile solo se perfila la primera repetición
+            prefix = os.path.join(profile_dir, name) if profile_dir and i == 0 else None
+            staged.append(_in_new_process(_run_staged, md_path, out_path, prefix))
+            pipeline.append(_in_new_process(_run_pipeline, md_path, out_path))
+
+        best_pipeline = min(run['wall_s'] for run in pipeline)
+        pipeline_rss = [run['peak_rss_kb'] for run in pipeline if run['peak_rss_kb'] is not None]
+        staged_rss = [run['peak_rss_kb'] for run in staged if run['peak_rss_kb'] is not None]
+        results[name] = {
+            'sections': sections,
+            'slides': pipeline[0]['slides'],
+            'md_mb': round(os.path.getsize(md_path) / (1024 * 1024), 4),
+            **{f"{stage}_s": round(min(run[f"{stage}_s"] for run in staged), 4) for stage in STAGES},
+            'staged_peak_rss_kb': max(staged_rss) if staged_rss else None,
+            'pipeline_s': round(best_pipeline, 4),
+            'repack_s': round(min(run['repack_s'] for run in pipeline), 4),
+            'slides_per_s': round(sections / best_pipeline, 1) if best_pipeline else None,
+            'pipeline_peak_rss_kb': max(pipeline_rss) if pipeline_rss else None,
+            'odp_bytes': pipeline[0]['odp_bytes'],
+        }
+        r = results[name]
+        print(
+            f"{name:16s} {sections:6d} secc  parse {r['parse_s']:7.3f}s  content {r['content_s']:7.3f}s  "
+            f"package {r['package_s']:7.3f}s  | cadena {r['pipeline_s']:7.3f}s  "
+            f"repack {r['repack_s']:7.3f}s  {r['pipeline_peak_rss_kb'] or 0:8d} KB  {r['odp_bytes']:9d} B"
+        )
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """Devuelve una lista de regresiones (vacía si todo está dentro de la tolerancia)."""
+    regressions = []
+    for case, current in results.items():
+        base = baseline.get(case)
+        if not base:
+            continue
+        # Más es peor en todas las métricas comparadas
+        for key in (*(f"{stage}_s" for stage in STAGES), 'pipeline_s', 'repack_s', 'staged_peak_rss_kb',
+                    'pipeline_peak_rss_kb', 'odp_bytes'):
+            if not base.get(key) or current.get(key) is None or current[key] <= base[key] * (1 + tolerance):
+                continue
+            if key.endswith('_s') and current[key] - base[key] < MIN_DELTA_S:
+                continue
+            regressions.append(f"{case}: {key} {current[key]} > baseline {base[key]}")
+    return regressions
+
+
+def _load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de convert_manual_to_odp.py con Markdown sintético")
+    parser.add_argument('--scale', type=float, default=1.0, help='Escala del tamaño de los documentos')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por caso (se toma el mejor tiempo)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichero de baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Margen permitido (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='Guardar los resultados en la baseline')
+    parser.add_argument('--profile', dest='profile_dir', default=None,
+                        help='Directorio donde guardar perfiles cProfile por caso y etapa')
+    parser.add_argument('--json', dest='json_out', default=None, help='Guardar los resultados en JSON')
+    parser.add_argument('--keep', dest='keep_dir', default=None, help='Directorio donde conservar los ficheros generados')
+    args = parser.parse_args(argv)
+
+    if args.profile_dir:
+        os.makedirs(args.profile_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix='bench_convert_odp_') as tmp_dir:
+        work_dir = args.keep_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        corpus = generate_corpus(work_dir, args.scale)
+        results = run_benchmarks(corpus, work_dir, args.repeat, args.profile_dir)
+
+    baseline = _load_baseline(args.baseline)
+
+    report = {
+        'generated': datetime.now().isoformat(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'results': results,
+    }
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.profile_dir:
+        print(f"[OK] Perfiles en {args.profile_dir} (los tiempos con profiling no se comparan con la baseline)")
+        return 0
+
+    if args.update_baseline:
+        if baseline is not None:
+            # Conservar los casos que no se han medido en esta ejecución
+            report['results'] = {**baseline.get('results', {}), **results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"[OK] Baseline actualizada: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"[AVISO] No hay baseline en {args.baseline}; usa --update-baseline", file=sys.stderr)
+        return 0
+    if baseline.get('scale') != args.scale:
+        print(f"[AVISO] La baseline usa --scale {baseline.get('scale')}; la comparación no es fiable", file=sys.stderr)
+
+    regressions = compare_with_baseline(results, baseline.get('results', {}), args.tolerance)
+    for regression in regressions:
+        print(f"[REGRESIÓN] {regression}")
+    if not regressions:
+        print("[OK] Sin regresiones respecto a la baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de rendimiento de scripts/pdf_to_txt.py
+
+Genera PDFs sintéticos sin conexión (sin dependencias extra) con varias formas
+de documento, ejecuta pdf_to_txt() con y sin --preserve-layout y compara
+páginas/s, MB/s y pico de memoria con una baseline guardada. También mide el
+arranque en frío del script (--help y ejecuciones en las que todo se omite) y
+comprueba que esas ejecuciones no importan pdfminer.
+
+Uso básico:
+  python scripts/bench_pdf_to_txt.py
+
+Opciones:
+  --scale 0.25         Escala el tamaño de los documentos (ejecuciones rápidas)
+  --repeat N           Repeticiones por caso; se toma el mejor tiempo (por defecto 3)
+  --page-jobs N        Pasa --page-jobs a pdf_to_txt() (para medir el modo por páginas)
+  --baseline FILE      Baseline a comparar (por defecto bench_pdf_to_txt.baseline.json)
+  --tolerance 0.25     Margen permitido antes de considerar una regresión
+  --update-baseline    Guarda los resultados actuales en la baseline (se fusionan con los existentes)
+  --startup-only       Mide solo el arranque en frío (rápido)
+  --json out.json      Guarda los resultados en JSON
+
+Código de salida: 0 sin regresiones; 1 si algún caso empeora más que la tolerancia.
+La baseline depende de la máquina: regenérala con --update-baseline en el host de referencia.
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_to_txt.py')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_pdf_to_txt.baseline.json')
+
+WORDS = (
+    "articulo stock precio cliente pedido factura albaran almacen proveedor sincronizacion "
+    "categoria referencia descripcion importe iva descuento tarifa unidad familia fabricante "
+    "verial woocommerce producto imagen pagina campo sesion usuario fecha codigo"
+).split()
+
+# (ancho, alto) en puntos
+A4 = (595.0, 842.0)
+SMALL_PAGE = (300.0, 200.0)
+HUGE_PAGE = (4000.0, 6000.0)
+
+
+# --- Generación de PDFs sintéticos ---
+
+def build_pdf(pages: List[Tuple[Tuple[float, float], bytes]]) -> bytes:
+    """Construye un PDF mínimo con fuente Helvetica y un content stream por página."""
+    objects: List[bytes] = []
+    n_pages = len(pages)
+    kids = ' '.join(f"{4 + 2 * i} 0 R" for i in range(n_pages))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode('ascii'))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for i, ((width, height), content) in enumerate(pages):
+        stream = zlib.compress(content)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.0f} {height:.0f}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode('ascii')
+        )
+        objects.append(
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode('ascii')
+            + stream + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('ascii')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode('ascii')
+    return bytes(out)
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def _text_page(rng: random.Random, size: Tuple[float, float], n_lines: int, font_size: float = 10) -> bytes:
+    leading = font_size * 1.2
+    words_per_line = max(2, int((size[0] - 80) / (font_size * 4.2)))
+    ops = [f"BT /F1 {font_size:g} Tf {leading:g} TL 40 {size[1] - 50:g} Td"]
+    for _ in range(n_lines):
+        ops.append(f"({_sentence(rng, words_per_line)}) Tj T*")
+    ops.append("ET")
+    return '\n'.join(ops).encode('latin-1')
+
+
+def _table_page(rng: random.Random, size: Tuple[float, float], n_rows: int, n_cols: int) -> bytes:
+    cell_w = (size[0] - 80) / n_cols
+    cell_h = 14.0
+    top = size[1] - 50
+    ops = ["0.5 w"]
+    for row in range(n_rows):
+        y = top - row * cell_h
+        for col in range(n_cols):
+            x = 40 + col * cell_w
+            ops.append(f"{x:.1f} {y - cell_h:.1f} {cell_w:.1f} {cell_h:.1f} re S")
+            if row == 0:
+                text = rng.choice(WORDS).upper()
+            elif col == 0:
+                text = f"REF{rng.randrange(100000):05d}"
+            else:
+                text = f"{rng.uniform(0, 9999):.2f}"
+            ops.append(f"BT /F1 7 Tf {x + 2:.1f} {y - cell_h + 4:.1f} Td ({text}) Tj ET")
+    return '\n'.join(ops).encode('latin-1')
+
+
+def _shape_text_heavy(rng: random.Random, scale: float) -> List[Tuple[Tuple[float, float], bytes]]:
+    return [(A4, _text_page(rng, A4, 60)) for _ in range(max(1, int(40 * scale)))]
+
+
+def _shape_table_heavy(rng: random.Random, scale: float) -> List[Tuple[Tuple[float, float], bytes]]:
+    return [(A4, _table_page(rng, A4, 50, 8)) for _ in range(max(1, int(20 * scale)))]
+
+
+def _shape_many_small_pages(rng: random.Random, scale: float) -> List[Tuple[Tuple[float, float], bytes]]:
+    return [(SMALL_PAGE, _text_page(rng, SMALL_PAGE, 4)) for _ in range(max(1, int(400 * scale)))]
+
+
+def _shape_few_huge_pages(rng: random.Random, scale: float) -> List[Tuple[Tuple[float, float], bytes]]:
+    return [(HUGE_PAGE, _text_page(rng, HUGE_PAGE, max(1, int(450 * scale)), 12)) for _ in range(3)]
+
+
+SHAPES: Dict[str, Callable[[random.Random, float], List[Tuple[Tuple[float, float], bytes]]]] = {
+    'text_heavy': _shape_text_heavy,
+    'table_heavy': _shape_table_heavy,
+    'many_small_pages': _shape_many_small_pages,
+    'few_huge_pages': _shape_few_huge_pages,
+}
+
+
+def generate_corpus(work_dir: str, scale: float = 1.0, seed: int = 1234) -> Dict[str, Tuple[str, int]]:
+    """Genera un PDF por forma en work_dir. Devuelve {forma: (ruta, nº de páginas)}."""
+    corpus = {}
+    for name, shape in SHAPES.items():
+        pages = shape(random.Random(f"{seed}:{name}"), scale)
+        path = os.path.join(work_dir, f"{name}.pdf")
+        with open(path, 'wb') as f:
+            f.write(build_pdf(pages))
+        corpus[name] = (path, len(pages))
+    return corpus
+
+
+# --- Ejecución ---
+
+def _run_case(pdf_path: str, out_path: str, preserve_layout: bool, page_jobs: int) -> Dict[str, Any]:
+    # Se ejecuta en un proceso nuevo para que el pico de RSS sea solo de este caso
+    from pdf_to_txt import pdf_to_txt
+
+    metrics: Dict[str, Any] = {}
+    ok, msg = pdf_to_txt(
+        pdf_path,
+        out_path=out_path,
+        overwrite=True,
+        preserve_layout=preserve_layout,
+        page_jobs=page_jobs,
+        metrics=metrics,
+    )
+    if not ok:
+        raise RuntimeError(msg)
+    return {key: metrics[key] for key in ('wall_s', 'cpu_s', 'peak_rss_kb', 'chars')}
+
+
+def run_benchmarks(
+    corpus: Dict[str, Tuple[str, int]],
+    work_dir: str,
+    repeat: int = 3,
+    page_jobs: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    ctx = multiprocessing.get_context('spawn')
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, (pdf_path, n_pages) in corpus.items():
+        size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+        for preserve_layout in (False, True):
+            case = f"{name}/{'layout' if preserve_layout else 'default'}"
+            out_path = os.path.join(work_dir, f"{name}-{int(preserve_layout)}.txt")
+            runs = []
+            for _ in range(max(1, repeat)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+                    runs.append(executor.submit(_run_case, pdf_path, out_path, preserve_layout, page_jobs).result())
+            best = min(run['wall_s'] for run in runs)
+            rss = [run['peak_rss_kb'] for run in runs if run['peak_rss_kb'] is not None]
+            results[case] = {
+                'pages': n_pages,
+                'size_mb': round(size_mb, 4),
+                'wall_s': round(best, 4),
+                'pages_per_s': round(n_pages / best, 2) if best else None,
+                'mb_per_s': round(size_mb / best, 4) if best else None,
+                'peak_rss_kb': max(rss) if rss else None,
+                'chars': runs[0]['chars'],
+            }
+            print(
+                f"{case:32s} {n_pages:5d} pág  {results[case]['pages_per_s']:9.2f} pág/s  "
+                f"{results[case]['mb_per_s']:8.4f} MB/s  {results[case]['peak_rss_kb'] or 0:8d} KB"
+            )
+    return results
+
+
+def _time_command(args: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _imports_pdfminer(args: List[str]) -> bool:
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', SCRIPT, *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    return any(line.rstrip().endswith(' pdfminer') for line in proc.stderr.splitlines())
+
+
+def run_startup_benchmarks(work_dir: str, repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    """
+    Mide el arranque en frío de pdf_to_txt.py en procesos nuevos.
+
+    'startup/help' es --help; 'startup/skip' es una pasada sobre PDFs cuyas
+    salidas ya existen (todo se omite). Ninguna de las dos debe cargar pdfminer.
+    """
+    pdfs = []
+    for i in range(20):
+        path = os.path.join(work_dir, f"startup_{i:02d}.pdf")
+        with open(path, 'wb') as f:
+            f.write(b"%PDF-1.4\n")
+        with open(os.path.join(work_dir, f"startup_{i:02d}.txt"), 'w', encoding='utf-8') as f:
+            f.write('')
+        pdfs.append(path)
+
+    cases = {
+        'startup/help': ['--help'],
+        'startup/skip': [*pdfs, '--out-dir', work_dir],
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for case, args in cases.items():
+        results[case] = {
+            'startup_ms': round(_time_command(args, repeat) * 1000, 1),
+            'imports_pdfminer': _imports_pdfminer(args),
+        }
+        print(f"{case:32s} {results[case]['startup_ms']:8.1f} ms  pdfminer={results[case]['imports_pdfminer']}")
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """Devuelve una lista de regresiones (vacía si todo está dentro de la tolerancia)."""
+    regressions = []
+    for case, current in results.items():
+        if current.get('imports_pdfminer'):
+            regressions.append(f"{case}: importa pdfminer sin necesidad")
+        base = baseline.get(case)
+        if not base:
+            continue
+        if base.get('startup_ms') and current.get('startup_ms') is not None \
+                and current['startup_ms'] > base['startup_ms'] * (1 + tolerance):
+            regressions.append(f"{case}: startup_ms {current['startup_ms']} > baseline {base['startup_ms']}")
+        for key in ('pages_per_s', 'mb_per_s'):
+            if base.get(key) and current.get(key) is not None and current[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{case}: {key} {current[key]} < baseline {base[key]}")
+        if base.get('peak_rss_kb') and current.get('peak_rss_kb') is not None \
+                and current['peak_rss_kb'] > base['peak_rss_kb'] * (1 + tolerance):
+            regressions.append(f"{case}: peak_rss_kb {current['peak_rss_kb']} > baseline {base['peak_rss_kb']}")
+    return regressions
+
+
+def _load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de pdf_to_txt.py con PDFs sintéticos")
+    parser.add_argument('--scale', type=float, default=1.0, help='Escala del tamaño de los documentos')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por caso (se toma el mejor tiempo)')
+    parser.add_argument('--page-jobs', dest='page_jobs', type=int, default=1, help='Valor de page_jobs para pdf_to_txt()')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichero de baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Margen permitido (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='Guardar los resultados en la baseline')
+    parser.add_argument('--startup-only', action='store_true', help='Medir solo el arranque en frío')
+    parser.add_argument('--json', dest='json_out', default=None, help='Guardar los resultados en JSON')
+    parser.add_argument('--keep', dest='keep_dir', default=None, help='Directorio donde conservar los PDFs generados')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='bench_pdf_to_txt_') as tmp_dir:
+        work_dir = args.keep_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        results = run_startup_benchmarks(work_dir)
+        if not args.startup_only:
+            corpus = generate_corpus(work_dir, args.scale)
+            results.update(run_benchmarks(corpus, work_dir, args.repeat, args.page_jobs))
+
+    import pdfminer
+
+    baseline = _load_baseline(args.baseline)
+
+    report = {
+        'generated': datetime.now().isoformat(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'pdfminer': getattr(pdfminer, '__version__', ''),
+        'scale': args.scale,
+        'page_jobs': args.page_jobs,
+        'results': results,
+    }
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        if baseline is not None:
+            # Conservar los casos que no se han medido en esta ejecución
+            report['results'] = {**baseline.get('results', {}), **results}
+            if args.startup_only:
+                report['scale'] = baseline.get('scale')
+                report['page_jobs'] = baseline.get('page_jobs')
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"[OK] Baseline actualizada: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"[AVISO] No hay baseline en {args.baseline}; usa --update-baseline", file=sys.stderr)
+        return 0
+    if not args.startup_only and baseline.get('scale') != args.scale:
+        print(f"[AVISO] La baseline usa --scale {baseline.get('scale')}; la comparación no es fiable", file=sys.stderr)
+
+    regressions = compare_with_baseline(results, baseline.get('results', {}), args.tolerance)
+    for regression in regressions:
+        print(f"[REGRESIÓN] {regression}")
+    if not regressions:
+        print("[OK] Sin regresiones respecto a la baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
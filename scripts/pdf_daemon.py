@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servicio residente de extracción de texto de PDF (pdfminer.six en caliente)
+
+Mantiene un pool de workers con pdfminer ya importado y atiende peticiones HTTP
+por un socket Unix o por localhost, de modo que cada petición paga solo el
+tiempo de parseo y no el arranque del intérprete.
+
+Arranque:
+  python scripts/pdf_daemon.py --socket /run/verial/pdf.sock --workers 4
+  python scripts/pdf_daemon.py --port 8765 --root /var/www/uploads
+
+Endpoints:
+  POST /extract   Cuerpo JSON: {"pdf": "/ruta/a.pdf", "pages": "1-3,5", "password": null,
+                                "preserve_layout": false, "encoding": "utf-8", "engine": "pdfminer"}
+                  Responde el texto en streaming (chunked), página a página, con
+                  el mismo '\\f' entre páginas que pdf_to_txt.py.
+  GET  /health    {"status": "ok"}
+  GET  /stats     Workers, cola, peticiones atendidas/fallidas/rechazadas y latencias
+
+Desde PHP (curl):
+  curl_setopt($ch, CURLOPT_UNIX_SOCKET_PATH, '/run/verial/pdf.sock');
+  curl_setopt($ch, CURLOPT_URL, 'http://localhost/extract');
+
+Opciones:
+  --workers N          Workers de extracción en caliente (por defecto: núcleos)
+  --max-queue N        Peticiones en espera antes de responder 503 (por defecto 32)
+  --timeout S          Tiempo máximo por petición; se mata y reemplaza el worker
+  --root DIR           Solo se permiten PDFs dentro de DIR
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import codecs
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_engines import engine_available, iter_engine_pages, resolve_engine  # noqa: E402
+from pdf_to_txt import PDFMINER_MISSING, is_pdfminer_missing, parse_pages  # noqa: E402
+
+MAX_REQUEST_BYTES = 64 * 1024
+HTTP_REASONS = {
+    200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+    503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+
+
+class RequestError(Exception):
+    """Error de petición que se responde con un código HTTP concreto."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Workers ---
+
+def _stream_worker_loop(conn: Any) -> None:
+    # Import en caliente: es el coste que el servicio evita en cada petición
+    try:
+        from pdfminer.converter import TextConverter  # noqa: F401
+        from pdfminer.pdfinterp import PDFPageInterpreter  # noqa: F401
+    except ImportError:
+        pass
+    if engine_available('pypdfium2'):
+        import pypdfium2  # noqa: F401
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        try:
+            for text in iter_engine_pages(
+                task['engine'],
+                task['pdf_path'],
+                password=task['password'],
+                page_numbers=task['page_numbers'],
+                preserve_layout=task['preserve_layout'],
+            ):
+                conn.send(('page', text))
+            conn.send(('done', None))
+        except Exception as e:
+            conn.send(('error', PDFMINER_MISSING if is_pdfminer_missing(e) else f"Error extrayendo texto: {e}"))
+
+
+class _StreamWorker:
+    def __init__(self, ctx: Any):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_stream_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+# --- Servicio ---
+
+class ExtractionDaemon:
+    """Servidor asyncio con un pool de workers en caliente y cola acotada."""
+
+    def __init__(
+        self,
+        n_workers: int,
+        max_queue: int = 32,
+        timeout: Optional[float] = None,
+        root: Optional[str] = None,
+    ):
+        self.n_workers = max(1, n_workers)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.root = os.path.realpath(root) if root else None
+        # spawn: el servicio usa hilos y no es seguro hacer fork de un proceso con hilos
+        self._ctx = multiprocessing.get_context('spawn')
+        self._idle: 'asyncio.Queue[_StreamWorker]' = asyncio.Queue()
+        self._workers: List[_StreamWorker] = []
+        self._threads = ThreadPoolExecutor(max_workers=self.n_workers, thread_name_prefix='pdf-daemon')
+        self._waiting = 0
+        self.stats: Dict[str, Any] = {
+            'started': time.time(),
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'worker_restarts': 0,
+            'total_ms': 0.0,
+            'last_ms': None,
+        }
+
+    def start_workers(self) -> None:
+        for _ in range(self.n_workers):
+            worker = _StreamWorker(self._ctx)
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.stop()
+        self._threads.shutdown(wait=False)
+
+    def _replace(self, worker: _StreamWorker) -> _StreamWorker:
+        worker.kill()
+        self._workers.remove(worker)
+        replacement = _StreamWorker(self._ctx)
+        self._workers.append(replacement)
+        self.stats['worker_restarts'] += 1
+        return replacement
+
+    def snapshot(self) -> Dict[str, Any]:
+        done = self.stats['completed'] + self.stats['failed']
+        return {
+            **self.stats,
+            'total_ms': round(self.stats['total_ms'], 1),
+            'uptime_s': round(time.time() - self.stats['started'], 1),
+            'workers': len(self._workers),
+            'idle': self._idle.qsize(),
+            'active': len(self._workers) - self._idle.qsize(),
+            'queued': self._waiting,
+            'max_queue': self.max_queue,
+            'avg_ms': round(self.stats['total_ms'] / done, 1) if done else None,
+        }
+
+    # --- HTTP ---
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+                if path == '/health':
+                    await _send_json(writer, 200, {'status': 'ok'})
+                elif path == '/stats':
+                    await _send_json(writer, 200, self.snapshot())
+                elif path == '/extract':
+                    if method != 'POST':
+                        raise RequestError(405, "Usa POST /extract")
+                    await self.extract(self._parse_job(body), writer)
+                else:
+                    raise RequestError(404, f"Ruta desconocida: {path}")
+            except RequestError as e:
+                await _send_json(writer, e.status, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _parse_job(self, body: bytes) -> Dict[str, Any]:
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise RequestError(400, "El cuerpo debe ser JSON")
+        if not isinstance(payload, dict) or not payload.get('pdf'):
+            raise RequestError(400, "Falta el campo 'pdf'")
+
+        pdf_path = os.path.realpath(str(payload['pdf']))
+        if self.root and os.path.commonpath([self.root, pdf_path]) != self.root:
+            raise RequestError(403, f"Ruta fuera de --root: {payload['pdf']}")
+        if not os.path.isfile(pdf_path):
+            raise RequestError(404, f"No existe el archivo PDF: {payload['pdf']}")
+        try:
+            page_numbers = parse_pages(payload.get('pages'))
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        encoding = str(payload.get('encoding') or 'utf-8')
+        try:
+            ''.encode(encoding)
+        except LookupError:
+            raise RequestError(400, f"Codificación desconocida: {encoding}")
+        preserve_layout = bool(payload.get('preserve_layout'))
+        try:
+            engine = resolve_engine(str(payload.get('engine') or 'pdfminer'), preserve_layout)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        return {
+            'pdf_path': pdf_path,
+            'password': payload.get('password'),
+            'page_numbers': page_numbers,
+            'preserve_layout': preserve_layout,
+            'encoding': encoding,
+            'engine': engine,
+        }
+
+    async def extract(self, job: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        # Contrapresión: con la cola llena se rechaza en vez de acumular peticiones
+        if self._idle.empty() and self._waiting >= self.max_queue:
+            self.stats['rejected'] += 1
+            raise RequestError(503, "Cola llena, reintenta más tarde")
+
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        headers_sent = False
+        # Un codificador para toda la respuesta: con utf-16 o utf-8-sig el BOM sale una
+        # vez al principio, como en el fichero que escribe pdf_to_txt.py
+        encoder = codecs.getincrementalencoder(job['encoding'])(errors='ignore')
+        encoded_any = False
+        ok = False
+        reusable = False  # worker libre (sin páginas pendientes en el pipe) o recién reemplazado
+        try:
+            worker.conn.send({key: job[key] for key in ('pdf_path', 'password', 'page_numbers', 'preserve_layout', 'engine')})
+            while True:
+                remaining = None
+                if self.timeout is not None:
+                    remaining = max(0.0, started + self.timeout - time.monotonic())
+                try:
+                    kind, value = await asyncio.wait_for(loop.run_in_executor(self._threads, worker.conn.recv), remaining)
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    worker, reusable = self._replace(worker), True
+                    if headers_sent:
+                        return
+                    raise RequestError(504, f"Tiempo límite excedido ({self.timeout:g}s)")
+                except (EOFError, OSError):
+                    worker, reusable = self._replace(worker), True
+                    if headers_sent:
+                        return
+                    raise RequestError(500, "El proceso de extracción terminó inesperadamente")
+
+                if kind == 'error':
+                    reusable = True
+                    if headers_sent:
+                        return  # se corta el stream sin el chunk final: el cliente lo detecta
+                    raise RequestError(422, value)
+                if not headers_sent:
+                    writer.write(_status_line(200) + (
+                        f"Content-Type: text/plain; charset={job['encoding']}\r\n"
+                        "Transfer-Encoding: chunked\r\n"
+                        "Connection: close\r\n\r\n"
+                    ).encode('ascii'))
+                    headers_sent = True
+                if kind == 'done':
+                    # Vacía el estado del codificador (sin BOM si el documento no tenía texto)
+                    _write_chunk(writer, encoder.encode('', final=True) if encoded_any else b'')
+                    writer.write(b"0\r\n\r\n")
+                    await writer.drain()
+                    ok = True
+                    return
+                if value:
+                    encoded_any = True
+                    if _write_chunk(writer, encoder.encode(value)):
+                        # Si el cliente lee despacio, drain() frena al worker a través del pipe
+                        await writer.drain()
+        finally:
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.stats['completed' if ok else 'failed'] += 1
+            self.stats['total_ms'] += elapsed_ms
+            self.stats['last_ms'] = round(elapsed_ms, 1)
+            if ok or reusable:
+                self._idle.put_nowait(worker)
+            else:
+                # El worker puede tener páginas pendientes en el pipe: se reemplaza
+                self._idle.put_nowait(self._replace(worker))
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        # El StreamReader corta a 64 KiB (su límite por defecto) antes de ver el final
+        raise RequestError(413, "Cabeceras demasiado grandes")
+    if len(head) > MAX_REQUEST_BYTES:
+        raise RequestError(413, "Cabeceras demasiado grandes")
+    lines = head.decode('latin-1').split("\r\n")
+    try:
+        method, target, _version = lines[0].split(' ', 2)
+    except ValueError:
+        raise RequestError(400, "Línea de petición inválida")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise RequestError(400, "Content-Length inválido")
+    if length > MAX_REQUEST_BYTES:
+        raise RequestError(413, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target.split('?', 1)[0], body
+
+
+def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> bool:
+    # Un chunk de Transfer-Encoding: chunked; los vacíos no se envían (el de tamaño 0 cierra)
+    if not data:
+        return False
+    writer.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+    return True
+
+
+def _status_line(status: int) -> bytes:
+    return f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n".encode('ascii')
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = (
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    if status == 503:
+        headers = "Retry-After: 1\r\n" + headers
+    writer.write(_status_line(status) + headers.encode('ascii') + body)
+    await writer.drain()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    daemon = ExtractionDaemon(args.workers or os.cpu_count() or 1, args.max_queue, args.timeout, args.root)
+    daemon.start_workers()
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = await asyncio.start_unix_server(daemon.handle, path=args.socket)
+        where = args.socket
+    else:
+        server = await asyncio.start_server(daemon.handle, host=args.host, port=args.port)
+        where = f"http://{args.host}:{args.port}"
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    print(f"[OK] Escuchando en {where} con {daemon.n_workers} workers", file=sys.stderr, flush=True)
+    async with server:
+        await stop.wait()
+    daemon.close()
+    if args.socket and os.path.exists(args.socket):
+        os.remove(args.socket)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Servicio residente de extracción de texto de PDF")
+    parser.add_argument('--socket', dest='socket', default=None, help='Ruta del socket Unix')
+    parser.add_argument('--host', dest='host', default='127.0.0.1', help='Host HTTP (por defecto 127.0.0.1)')
+    parser.add_argument('--port', dest='port', type=int, default=8765, help='Puerto HTTP (por defecto 8765)')
+    parser.add_argument('--workers', dest='workers', type=int, default=0, help='Workers en caliente (0 = núcleos)')
+    parser.add_argument('--max-queue', dest='max_queue', type=int, default=32,
+                        help='Peticiones en espera antes de responder 503')
+    parser.add_argument('--timeout', dest='timeout', type=float, default=None, help='Segundos máximos por petición')
+    parser.add_argument('--root', dest='root', default=None, help='Solo permitir PDFs dentro de este directorio')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
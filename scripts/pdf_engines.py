@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motores de extracción de texto intercambiables para pdf_to_txt.py
+
+pdfminer.six es el motor de referencia (el más fiel y el único con análisis de
+layout propio); si están instalados se pueden usar motores más rápidos:
+
+  pypdfium2    pip install pypdfium2           (PDFium, el motor de Chrome)
+  pdftotext    apt install poppler-utils       (binario de poppler en el PATH)
+
+Todos producen el texto página a página con un '\\f' al final de cada página,
+igual que pdfminer, así que los índices de páginas y de texto completo siguen
+funcionando con cualquiera de ellos.
+
+Elegir motor al extraer:
+  python scripts/pdf_to_txt.py docs/ --out-dir txt/ --engine auto
+
+Ver los motores disponibles:
+  python scripts/pdf_engines.py list
+
+Comparar motores (velocidad y similitud del texto frente a pdfminer):
+  python scripts/pdf_engines.py compare docs/ --json comparacion.json
+
+Opciones de compare:
+  --engines a,b        Motores a comparar (por defecto, todos los disponibles); el primero es la referencia
+  --pages 1-3,5,9      Rango de páginas a extraer (1-indexed)
+  --password <pwd>     Contraseña del PDF (si está protegido)
+  --preserve-layout    Modo layout (solo motores que lo soportan)
+  --json out.json      Guardar los resultados en JSON
+"""
+from __future__ import annotations
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# difflib, subprocess y tempfile se importan donde se usan: pdf_to_txt.py
+# carga este módulo al arrancar y no debe pagar su coste en --help.
+ENGINES = ('pdfminer', 'pypdfium2', 'pdftotext')
+# Orden de preferencia de --engine auto cuando no hace falta el layout de pdfminer
+FAST_ENGINES = ('pypdfium2', 'pdftotext')
+LAYOUT_ENGINES = ('pdfminer', 'pdftotext')
+
+INSTALL_HINTS = {
+    'pdfminer': "pip install pdfminer.six",
+    'pypdfium2': "pip install pypdfium2",
+    'pdftotext': "instala poppler-utils (binario pdftotext en el PATH)",
+}
+
+
+@lru_cache(maxsize=None)
+def engine_available(name: str) -> bool:
+    """Comprueba si el motor está instalado, sin importarlo."""
+    if name == 'pdfminer':
+        return importlib.util.find_spec('pdfminer') is not None
+    if name == 'pypdfium2':
+        return importlib.util.find_spec('pypdfium2') is not None
+    if name == 'pdftotext':
+        return shutil.which('pdftotext') is not None
+    return False
+
+
+def available_engines() -> List[str]:
+    return [name for name in ENGINES if engine_available(name)]
+
+
+def resolve_engine(name: str, preserve_layout: bool = False, page_boxes: bool = False) -> str:
+    """
+    Traduce --engine a un motor concreto. Lanza ValueError si no es utilizable.
+
+    Con 'auto' se usa el motor rápido disponible, salvo que se pida
+    --preserve-layout o --page-boxes: ahí se mantiene pdfminer, que es el que
+    reconstruye bien las tablas y el único que da las cajas de texto.
+    """
+    if name == 'auto':
+        if preserve_layout or page_boxes:
+            return 'pdfminer'
+        for candidate in FAST_ENGINES:
+            if engine_available(candidate):
+                return candidate
+        return 'pdfminer'
+
+    if name not in ENGINES:
+        raise ValueError(f"Motor desconocido: {name} (opciones: auto, {', '.join(ENGINES)})")
+    if not engine_available(name):
+        raise ValueError(f"Motor no disponible: {name}. Para usarlo: {INSTALL_HINTS[name]}")
+    if page_boxes and name != 'pdfminer':
+        raise ValueError(f"--page-boxes requiere el motor pdfminer (pedido: {name})")
+    if preserve_layout and name not in LAYOUT_ENGINES:
+        raise ValueError(f"El motor {name} no soporta --preserve-layout")
+    return name
+
+
+@lru_cache(maxsize=None)
+def engine_version(name: str) -> str:
+    """Versión del motor (forma parte de la clave de caché)."""
+    if name == 'pdftotext':
+        import subprocess
+
+        try:
+            result = subprocess.run(['pdftotext', '-v'], capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            return ''
+        lines = (result.stderr or result.stdout).strip().splitlines()
+        return lines[0] if lines else ''
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version('pdfminer.six' if name == 'pdfminer' else name)
+    except PackageNotFoundError:
+        return ''
+
+
+def _selected_pages(total: int, page_numbers: Optional[Sequence[int]]) -> List[int]:
+    # Misma semántica que pdfminer: orden de documento, sin duplicados ni páginas inexistentes
+    if page_numbers is None:
+        return list(range(total))
+    return sorted({p for p in page_numbers if 0 <= p < total})
+
+
+def _page_text(text: str) -> str:
+    # Normaliza a la forma de pdfminer: saltos '\n' y un '\f' solo al final de la página
+    text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\f', '')
+    if text and not text.endswith('\n'):
+        text += '\n'
+    return text + '\f'
+
+
+def _iter_pypdfium2(
+    pdf_path: str,
+    password: Optional[str],
+    page_numbers: Optional[List[int]],
+) -> Iterator[str]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_path, password=password or None)
+    try:
+        for i in _selected_pages(len(pdf), page_numbers):
+            page = pdf[i]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+            yield _page_text(text)
+    finally:
+        pdf.close()
+
+
+def _pdfinfo_pages(pdf_path: str, password: Optional[str]) -> Optional[int]:
+    # Número de páginas según pdfinfo (de poppler-utils, como pdftotext); None si no se sabe
+    import subprocess
+
+    cmd = ['pdfinfo']
+    if password:
+        cmd += ['-upw', password]
+    try:
+        result = subprocess.run(cmd + [pdf_path], capture_output=True, text=True, errors='replace', timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    for line in result.stdout.splitlines():
+        if line.startswith('Pages:'):
+            try:
+                return int(line.split(':', 1)[1])
+            except ValueError:
+                return None
+    return None
+
+
+def _iter_pdftotext(
+    pdf_path: str,
+    password: Optional[str],
+    page_numbers: Optional[List[int]],
+    preserve_layout: bool,
+) -> Iterator[str]:
+    import io
+    import subprocess
+    import tempfile
+
+    selected = sorted({p for p in page_numbers if p >= 0}) if page_numbers is not None else None
+    if selected:
+        # poppler rechaza un -f posterior a la última página ("Wrong page range given");
+        # como los demás motores, las páginas que no existen simplemente no se extraen
+        total = _pdfinfo_pages(pdf_path, password)
+        if total is not None:
+            selected = [p for p in selected if p < total]
+    if selected == []:
+        return
+
+    # Nota: con contraseña, esta queda visible en la línea de comandos del proceso
+    cmd = ['pdftotext', '-enc', 'UTF-8']
+    if preserve_layout:
+        cmd.append('-layout')
+    if password:
+        cmd += ['-upw', password]
+    if selected is not None:
+        cmd += ['-f', str(selected[0] + 1), '-l', str(selected[-1] + 1)]
+    cmd += [pdf_path, '-']
+
+    wanted = set(selected) if selected is not None else None
+    page = selected[0] if selected is not None else 0
+    # stderr a un temporal: los avisos de poppler pueden llenar un pipe y bloquear
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+        try:
+            assert proc.stdout is not None
+            reader = io.TextIOWrapper(proc.stdout, encoding='utf-8', errors='replace', newline='')
+            pending = ''
+            # poppler termina cada página con '\f': se entrega cada una en cuanto está completa
+            for chunk in iter(lambda: reader.read(1 << 16), ''):
+                pending += chunk
+                *done, pending = pending.split('\f')
+                for text in done:
+                    if wanted is None or page in wanted:
+                        yield _page_text(text)
+                    page += 1
+            returncode = proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        if returncode != 0:
+            errors.seek(0)
+            detail = errors.read().decode('utf-8', errors='replace').strip().splitlines()
+            raise RuntimeError(detail[-1] if detail else f"pdftotext terminó con código {returncode}")
+
+
+def iter_engine_pages(
+    engine: str,
+    pdf_path: str,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    preserve_layout: bool = False,
+) -> Iterator[str]:
+    """
+    Extrae el texto página a página con el motor indicado (ya resuelto).
+
+    Cada página termina en '\\f'. Con pdfminer el resultado es idéntico al de
+    pdf_to_txt.iter_pages(); con los demás motores el texto es equivalente,
+    pero no igual byte a byte.
+    """
+    if engine == 'pdfminer':
+        from pdf_to_txt import build_laparams, iter_pages
+
+        return iter_pages(pdf_path, password=password, page_numbers=page_numbers,
+                          laparams=build_laparams(preserve_layout))
+    if engine == 'pypdfium2':
+        return _iter_pypdfium2(pdf_path, password, page_numbers)
+    if engine == 'pdftotext':
+        return _iter_pdftotext(pdf_path, password, page_numbers, preserve_layout)
+    raise ValueError(f"Motor desconocido: {engine}")
+
+
+# --- Comparación de motores ---
+
+def text_similarity(reference: List[str], candidate: List[str]) -> float:
+    """
+    Similitud (0-1) entre dos textos dados por páginas.
+
+    Se compara página a página por palabras (sin tener en cuenta espacios ni
+    saltos de línea) y se pondera por el tamaño de cada página, lo que es mucho
+    más barato que un diff del documento completo.
+    """
+    import difflib
+    from itertools import zip_longest
+
+    matched = total = 0
+    for ref_page, cand_page in zip_longest(reference, candidate, fillvalue=''):
+        ref_words, cand_words = ref_page.split(), cand_page.split()
+        size = len(ref_words) + len(cand_words)
+        if not size:
+            continue
+        matcher = difflib.SequenceMatcher(None, ref_words, cand_words, autojunk=False)
+        matched += 2 * sum(block.size for block in matcher.get_matching_blocks())
+        total += size
+    return matched / total if total else 1.0
+
+
+def compare_engines(
+    pdf_path: str,
+    engines: Sequence[str],
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    preserve_layout: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Extrae el PDF con cada motor y mide tiempo, páginas, caracteres y similitud.
+
+    El primer motor es la referencia: 'similarity' y 'speedup' de los demás se
+    calculan frente a él.
+    """
+    results: List[Dict[str, Any]] = []
+    reference: Optional[List[str]] = None
+    reference_s: Optional[float] = None
+    for i, engine in enumerate(engines):
+        row: Dict[str, Any] = {'pdf': pdf_path, 'engine': engine, 'version': engine_version(engine)}
+        started = time.perf_counter()
+        try:
+            pages = list(iter_engine_pages(engine, pdf_path, password, page_numbers, preserve_layout))
+        except Exception as e:
+            row.update({'ok': False, 'error': str(e)})
+            results.append(row)
+            continue
+        wall_s = time.perf_counter() - started
+        row.update({
+            'ok': True,
+            'wall_s': round(wall_s, 6),
+            'pages': len(pages),
+            'chars': sum(len(page) for page in pages),
+        })
+        if i == 0:
+            reference, reference_s = pages, wall_s
+        elif reference is not None and reference_s is not None:
+            row['similarity'] = round(text_similarity(reference, pages), 4)
+            row['speedup'] = round(reference_s / wall_s, 2) if wall_s else None
+        results.append(row)
+    return results
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Motores de extracción de texto de PDF")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='Mostrar los motores y si están disponibles')
+
+    compare = sub.add_parser('compare', help='Comparar velocidad y similitud del texto entre motores')
+    compare.add_argument('pdfs', nargs='+', help='PDFs, carpetas o patrones glob')
+    compare.add_argument('--engines', dest='engines', default=None,
+                         help='Motores separados por comas; el primero es la referencia')
+    compare.add_argument('--pages', dest='pages', default=None, help='Rango de páginas, ej: 1-3,5,9')
+    compare.add_argument('--password', dest='password', default=None, help='Contraseña del PDF (si aplica)')
+    compare.add_argument('--preserve-layout', action='store_true', help='Modo layout')
+    compare.add_argument('--json', dest='json_path', default=None, help='Guardar los resultados en JSON')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in ENGINES:
+            if engine_available(name):
+                print(f"[OK] {name} {engine_version(name)}".rstrip())
+            else:
+                print(f"[--] {name} (no disponible: {INSTALL_HINTS[name]})")
+        print(f"auto -> {resolve_engine('auto')}")
+        return 0
+
+    from pdf_to_txt import expand_inputs, parse_pages
+
+    try:
+        page_numbers = parse_pages(args.pages)
+        engines = args.engines.split(',') if args.engines else available_engines()
+        engines = [resolve_engine(name.strip(), args.preserve_layout) for name in engines]
+    except ValueError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    entries = expand_inputs(args.pdfs)
+    if not entries:
+        print("[ERROR] No se encontraron PDFs en las entradas indicadas", file=sys.stderr)
+        return 1
+
+    rows: List[Dict[str, Any]] = []
+    ok = True
+    for pdf_path, _rel_path in entries:
+        for row in compare_engines(pdf_path, engines, args.password, page_numbers, args.preserve_layout):
+            rows.append(row)
+            name = f"{os.path.basename(pdf_path)} [{row['engine']}]"
+            if not row['ok']:
+                ok = False
+                print(f"[ERROR] {name} -> {row['error']}")
+                continue
+            line = f"[OK] {name} {row['wall_s']:.3f}s, {row['pages']} págs, {row['chars']} caracteres"
+            if 'similarity' in row:
+                speedup = f"x{row['speedup']:g}" if row['speedup'] else "-"
+                line += f", {speedup} frente a {engines[0]}, similitud {row['similarity']:.4f}"
+            else:
+                line += " (referencia)"
+            print(line)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
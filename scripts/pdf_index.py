@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de texto completo (SQLite FTS5) sobre el texto extraído por pdf_to_txt.py
+
+Cada página de cada documento es una fila del índice, así que las búsquedas
+devuelven documento + número de página + fragmento sin releer los TXT.
+
+Indexar mientras se extrae:
+  python scripts/pdf_to_txt.py docs/ --out-dir txt/ --index manuales.db
+
+Indexar TXT ya extraídos (p. ej. "Manual integración servicio Web Verial.txt"):
+  python scripts/pdf_index.py add manuales.db "Manual integración servicio Web Verial.txt"
+
+Buscar:
+  python scripts/pdf_index.py search manuales.db "Id_Articulo" --limit 5
+
+Opciones de search:
+  --limit N            Máximo de resultados (por defecto 20)
+  --doc TEXTO          Limitar a documentos cuya ruta contenga TEXTO
+  --fts                Interpretar la consulta con la sintaxis FTS5 (AND, OR, NEAR, prefijo*)
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from typing import List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    text_path TEXT,
+    text_sha256 TEXT NOT NULL,
+    page_count INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    text,
+    doc_id UNINDEXED,
+    page UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def open_index(db_path: str) -> sqlite3.Connection:
+    """Abre (o crea) el índice. Lanza RuntimeError si SQLite no tiene FTS5."""
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise RuntimeError(f"SQLite sin soporte FTS5: {e}")
+    return conn
+
+
+def index_text_file(
+    conn: sqlite3.Connection,
+    text_path: str,
+    source_path: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    encoding: str = "utf-8",
+) -> Tuple[bool, int]:
+    """
+    Indexa (o re-indexa) un TXT extraído, una fila por página.
+
+    Las páginas se separan por el '\\f' que emite pdfminer. `page_numbers` son
+    las páginas (0-index) extraídas con --pages, para conservar la numeración
+    original; `source_path` es el PDF de origen (clave del documento).
+    Si el texto no ha cambiado desde la última indexación no se toca nada.
+    Devuelve (indexado, nº de páginas).
+    """
+    with open(text_path, 'r', encoding=encoding, errors='ignore') as f:
+        text = f.read()
+    text_sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    key = os.path.abspath(source_path or text_path)
+
+    row = conn.execute("SELECT id, text_sha256, page_count FROM documents WHERE path = ?", (key,)).fetchone()
+    if row is not None and row[1] == text_sha256:
+        return False, row[2]
+
+    pages = text.split('\f')
+    if pages and not pages[-1].strip():
+        pages.pop()  # pdfminer termina cada página con '\f'
+    selected = sorted(set(page_numbers)) if page_numbers is not None else None
+
+    with conn:
+        if row is not None:
+            doc_id = row[0]
+            conn.execute("DELETE FROM pages WHERE doc_id = ?", (doc_id,))
+            conn.execute(
+                "UPDATE documents SET text_path = ?, text_sha256 = ?, page_count = ?, indexed_at = ? WHERE id = ?",
+                (os.path.abspath(text_path), text_sha256, len(pages), time.time(), doc_id),
+            )
+        else:
+            cursor = conn.execute(
+                "INSERT INTO documents (path, text_path, text_sha256, page_count, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, os.path.abspath(text_path), text_sha256, len(pages), time.time()),
+            )
+            doc_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO pages (text, doc_id, page) VALUES (?, ?, ?)",
+            (
+                (page_text, doc_id, (selected[i] if selected is not None and i < len(selected) else i) + 1)
+                for i, page_text in enumerate(pages)
+                if page_text.strip()
+            ),
+        )
+    return True, len(pages)
+
+
+def _plain_query(query: str) -> str:
+    # Cada término entre comillas: "Id_Articulo" o "fecha-alta" no rompen la sintaxis FTS5
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    limit: int = 20,
+    doc_filter: Optional[str] = None,
+    fts_syntax: bool = False,
+) -> List[Tuple[str, int, str]]:
+    """Busca en el índice. Devuelve [(documento, página, fragmento)] por relevancia."""
+    match = query if fts_syntax else _plain_query(query)
+    if not match:
+        return []
+    sql = (
+        "SELECT d.path, p.page, snippet(pages, 0, '[', ']', '…', 16) "
+        "FROM pages p JOIN documents d ON d.id = p.doc_id "
+        "WHERE pages MATCH ?"
+    )
+    params: List[object] = [match]
+    if doc_filter:
+        sql += " AND d.path LIKE ?"
+        params.append(f"%{doc_filter}%")
+    sql += " ORDER BY bm25(pages) LIMIT ?"
+    params.append(limit)
+    return [(path, int(page), snippet) for path, page, snippet in conn.execute(sql, params)]
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Índice de texto completo de los TXT extraídos de PDFs")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    add = sub.add_parser('add', help='Indexar TXT ya extraídos')
+    add.add_argument('index', help='Ruta de la base de datos del índice')
+    add.add_argument('texts', nargs='+', help='Ficheros TXT (páginas separadas por \\f)')
+    add.add_argument('--encoding', dest='encoding', default='utf-8', help='Codificación de los TXT')
+
+    find = sub.add_parser('search', help='Buscar en el índice')
+    find.add_argument('index', help='Ruta de la base de datos del índice')
+    find.add_argument('query', help='Términos a buscar')
+    find.add_argument('--limit', type=int, default=20, help='Máximo de resultados (por defecto 20)')
+    find.add_argument('--doc', dest='doc', default=None, help='Limitar a documentos cuya ruta contenga este texto')
+    find.add_argument('--fts', action='store_true', help='Usar sintaxis FTS5 en la consulta')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'search' and not os.path.isfile(args.index):
+        print(f"[ERROR] No existe el índice: {args.index}", file=sys.stderr)
+        return 1
+
+    try:
+        conn = open_index(args.index)
+    except RuntimeError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == 'add':
+            ok = True
+            for text_path in args.texts:
+                try:
+                    indexed, n_pages = index_text_file(conn, text_path, encoding=args.encoding)
+                except OSError as e:
+                    ok = False
+                    print(f"[ERROR] {text_path} -> {e}")
+                    continue
+                state = f"{n_pages} páginas" if indexed else "sin cambios"
+                print(f"[OK] {text_path} -> {state}")
+            return 0 if ok else 1
+
+        try:
+            results = search(conn, args.query, args.limit, args.doc, args.fts)
+        except sqlite3.OperationalError as e:
+            print(f"[ERROR] Consulta inválida: {e}", file=sys.stderr)
+            return 1
+        for path, page, snippet in results:
+            snippet = ' '.join(snippet.split())
+            print(f"{path}:{page}: {snippet}")
+        return 0 if results else 1
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Acceso aleatorio por página a los TXT generados por pdf_to_txt.py
+
+Junto a cada TXT se guarda un índice JSONL (<salida>.pages.jsonl) con el
+desplazamiento en bytes y la longitud de cada página y, opcionalmente, las
+coordenadas de las cajas de texto del layout. PageReader proyecta el TXT en
+memoria (mmap) y devuelve cualquier página o rango sin leer el resto.
+
+Generar el índice al extraer:
+  python scripts/pdf_to_txt.py manual.pdf --page-index [--page-boxes]
+
+Generar el índice de un TXT ya extraído:
+  python scripts/pdf_pages.py index "Manual integración servicio Web Verial.txt"
+
+Leer páginas:
+  python scripts/pdf_pages.py show "Manual integración servicio Web Verial.txt" 24-26
+
+Formato del índice: la primera línea es la cabecera
+  {"version": 1, "encoding": "utf-8", "pages": N}
+y después una línea por página
+  {"page": 24, "offset": 51234, "length": 1830, "boxes": [[x0, y0, x1, y1, "texto"], ...]}
+con "page" en numeración original del PDF (1-index) y "boxes" solo si se pidió.
+"""
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.pages.jsonl'
+
+# Cajas de texto de una página: (x0, y0, x1, y1, texto)
+Box = Tuple[float, float, float, float, str]
+
+
+def page_index_path(txt_path: str) -> str:
+    return f"{txt_path}{INDEX_SUFFIX}"
+
+
+def _separator(encoding: str) -> bytes:
+    # '\f' codificado sin BOM; las páginas se localizan buscando este separador
+    sep = '\f'.encode(encoding)
+    for bom in (b'\xff\xfe\x00\x00', b'\x00\x00\xfe\xff', b'\xff\xfe', b'\xfe\xff', b'\xef\xbb\xbf'):
+        if sep.startswith(bom) and len(sep) > len(bom):
+            return sep[len(bom):]
+    return sep
+
+
+def build_page_index(
+    txt_path: str,
+    encoding: str = 'utf-8',
+    page_numbers: Optional[Sequence[int]] = None,
+    boxes: Optional[Sequence[Sequence[Box]]] = None,
+) -> str:
+    """
+    Escribe el índice de páginas de un TXT cuyas páginas terminan en '\\f'.
+
+    El TXT se recorre una sola vez buscando el separador, sin decodificarlo.
+    `page_numbers` son las páginas (0-index) extraídas con --pages, para
+    conservar la numeración original. Devuelve la ruta del índice.
+    """
+    sep = _separator(encoding)
+    selected = sorted(set(page_numbers)) if page_numbers is not None else None
+    entries: List[Dict[str, Any]] = []
+
+    size = os.path.getsize(txt_path)
+    with open(txt_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            start = 0
+            while start < size:
+                end = data.find(sep, start)
+                if end < 0:
+                    end = size  # última página sin separador final
+                i = len(entries)
+                entry: Dict[str, Any] = {
+                    'page': (selected[i] if selected is not None and i < len(selected) else i) + 1,
+                    'offset': start,
+                    'length': end - start,
+                }
+                if boxes is not None and i < len(boxes):
+                    entry['boxes'] = [list(box) for box in boxes[i]]
+                entries.append(entry)
+                start = end + len(sep)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    index_path = page_index_path(txt_path)
+    tmp_path = f"{index_path}.part"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'version': INDEX_VERSION, 'encoding': encoding, 'pages': len(entries)}) + '\n')
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class PageReader:
+    """
+    Lector por página de un TXT con índice .pages.jsonl.
+
+    Uso:
+        with PageReader('manual.txt') as reader:
+            texto = reader.page(240)
+            rango = reader.pages(240, 245)
+    """
+
+    def __init__(self, txt_path: str, index_path: Optional[str] = None):
+        self.txt_path = txt_path
+        self.index_path = index_path or page_index_path(txt_path)
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._order: List[int] = []
+
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != INDEX_VERSION:
+                raise ValueError(f"Versión de índice no soportada: {header.get('version')}")
+            self.encoding = header.get('encoding', 'utf-8')
+            for line in f:
+                entry = json.loads(line)
+                self._entries[entry['page']] = entry
+                self._order.append(entry['page'])
+
+        self._file = open(txt_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __enter__(self) -> 'PageReader':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def close(self) -> None:
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+
+    def page_numbers(self) -> List[int]:
+        """Números de página disponibles (1-index, numeración original del PDF)."""
+        return list(self._order)
+
+    def page_bytes(self, page: int) -> bytes:
+        entry = self._entries.get(page)
+        if entry is None:
+            raise KeyError(f"Página no disponible: {page}")
+        if self._data is None:
+            return b''
+        return self._data[entry['offset']:entry['offset'] + entry['length']]
+
+    def page(self, page: int) -> str:
+        """Texto de una página (sin el '\\f' final)."""
+        return self.page_bytes(page).decode(self.encoding, errors='ignore')
+
+    def pages(self, first: int, last: int) -> List[str]:
+        """Textos de las páginas disponibles en [first, last], en orden."""
+        return [self.page(p) for p in self._order if first <= p <= last]
+
+    def boxes(self, page: int) -> List[Box]:
+        """Cajas de texto de la página, si el índice se generó con --page-boxes."""
+        entry = self._entries.get(page)
+        if entry is None:
+            raise KeyError(f"Página no disponible: {page}")
+        return [tuple(box) for box in entry.get('boxes', [])]  # type: ignore[misc]
+
+
+def _parse_range(value: str) -> Tuple[int, int]:
+    if '-' in value:
+        first_s, last_s = value.split('-', 1)
+        return int(first_s), int(last_s)
+    return int(value), int(value)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Acceso aleatorio por página a TXT extraídos de PDFs")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('index', help='Generar el índice de páginas de TXT ya extraídos')
+    build.add_argument('texts', nargs='+', help='Ficheros TXT (páginas separadas por \\f)')
+    build.add_argument('--encoding', dest='encoding', default='utf-8', help='Codificación de los TXT')
+
+    show = sub.add_parser('show', help='Mostrar una página o rango (ej: 24 o 24-26)')
+    show.add_argument('text', help='Fichero TXT con índice')
+    show.add_argument('pages', help='Página o rango de páginas (1-index)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'index':
+        ok = True
+        for text_path in args.texts:
+            try:
+                index_path = build_page_index(text_path, encoding=args.encoding)
+            except (OSError, LookupError) as e:
+                ok = False
+                print(f"[ERROR] {text_path} -> {e}")
+                continue
+            print(f"[OK] {text_path} -> {index_path}")
+        return 0 if ok else 1
+
+    try:
+        first, last = _parse_range(args.pages)
+    except ValueError:
+        print(f"[ERROR] Rango de páginas inválido: {args.pages}", file=sys.stderr)
+        return 1
+    try:
+        with PageReader(args.text) as reader:
+            texts = reader.pages(first, last)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    if not texts:
+        print(f"[ERROR] Páginas no disponibles: {args.pages}", file=sys.stderr)
+        return 1
+    sys.stdout.write('\f'.join(texts))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cadena PDF → texto → Markdown → ODP en un solo comando
+
+Encadena en streaming tres etapas, cada una con su caché por contenido:
+  texto      extracción por página (caché de pdf_to_txt.py: hash del PDF + opciones)
+  markdown   cada página se convierte en una o varias secciones '## '
+  slides     FixedManualToODPConverter con la caché de render por slide
+             (hash de la sección Markdown + maquetación)
+
+Cada página pasa a la etapa siguiente en cuanto se extrae, sin esperar al
+resto del documento. Si cambia una página del PDF, las secciones del resto
+de páginas no cambian y sus slides salen de la caché: solo se renderizan de
+nuevo las de la página modificada.
+
+Uso básico (genera el .odp junto al PDF):
+  python scripts/pdf_to_slides.py "Contexto API.pdf" --cache-dir .cache/slides
+
+Uso múltiple / carpetas (se replica el árbol bajo --out-dir):
+  python scripts/pdf_to_slides.py docs/ "Contexto API.pdf" --out-dir decks/ --markdown
+
+Opciones:
+  --out ruta.odp       Ruta de salida (si un único PDF)
+  --out-dir DIR        Directorio de salida
+  --markdown           Guarda también el Markdown intermedio (<salida>.md) para retocarlo a mano
+                       y regenerar después con convert_manual_to_odp.py
+  --cache-dir DIR      Caché de las etapas: texto en DIR/objects (la misma que pdf_to_txt.py
+                       --cache-dir) y slides en DIR/slides
+  --password <pwd>     Contraseña del PDF (si está protegido)
+  --pages 1-3,5,9      Rango de páginas a extraer (1-indexed)
+  --preserve-layout    Intenta conservar layout (mejor para tablas simples)
+  --engine NOMBRE      Motor de extracción: pdfminer (por defecto), pypdfium2, pdftotext o auto
+
+Los PDF sin texto se omiten. Código de salida: 0 si todo OK, 1 si alguno falló.
+"""
+from __future__ import annotations
+import argparse
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(SCRIPTS_DIR))
+
+from convert_manual_to_odp import MARKDOWN_MARKERS, SLIDE_LAYOUT, FixedManualToODPConverter, plan_jobs  # noqa: E402
+from pdf_engines import resolve_engine  # noqa: E402
+from pdf_to_txt import PDFMINER_MISSING, expand_inputs, is_pdfminer_missing, iter_cached_pages, parse_pages  # noqa: E402
+
+# Viñetas de símbolo habituales en el texto extraído (incluidas las de Symbol/Wingdings
+# en el área privada)
+SYMBOL_BULLETS = ('•', '●', '▪', '◦', '·', '✓', '\uf0b7', '\uf0a7', '\uf0d8')
+# Guiones y asteriscos solo son viñeta seguidos de espacio: "-5% dto" o "**nota**" no lo son
+_DASH_BULLET = re.compile(r'^[-*–]\s+(?=\S)')
+# Un primer bloque más largo no se usa como título de la slide
+TITLE_MAX_CHARS = 80
+
+
+def _markdown_item(block: str) -> str:
+    """Línea Markdown de un bloque de texto: viñeta o texto (escapando la sintaxis de Markdown)"""
+    for bullet in SYMBOL_BULLETS:
+        if block.startswith(bullet) and block[len(bullet):].strip():
+            return f"- {block[len(bullet):].strip()}"
+    dash = _DASH_BULLET.match(block)
+    if dash:
+        return f"- {block[dash.end():]}"
+    # '#', '|', '-' o '*' al principio se leerían como sección, tabla, separador o
+    # negrita: con la barra delante el conversor los muestra como texto, sin la barra
+    if block[0] in MARKDOWN_MARKERS:
+        return f"\\{block}"
+    return block
+
+
+def page_to_markdown(text: str, page: int, max_items: int = SLIDE_LAYOUT['max_items']) -> List[str]:
+    """
+    Secciones Markdown ('## ') de una página de texto extraído, como líneas con '\\n'.
+
+    Cada bloque (separado por líneas en blanco) es un elemento; el primero hace
+    de título si es corto. Como una slide muestra `max_items` elementos, las
+    páginas largas se reparten en varias secciones "Título (2)", "Título (3)"...
+    Una página sin texto no produce ninguna sección.
+    """
+    blocks = []
+    for block in text.replace('\f', '').split('\n\n'):
+        joined = ' '.join(line.strip() for line in block.splitlines() if line.strip())
+        # Los números de página sueltos son ruido de cabeceras y pies
+        if joined and not joined.isdigit():
+            blocks.append(joined)
+    if not blocks:
+        return []
+
+    if len(blocks[0]) <= TITLE_MAX_CHARS:
+        title, blocks = blocks[0], blocks[1:]
+    else:
+        title = f"Página {page}"
+
+    lines = []
+    for i in range(0, max(len(blocks), 1), max_items):
+        heading = title if i == 0 else f"{title} ({i // max_items + 1})"
+        lines += [f"## {heading}\n", "\n"]
+        lines += [f"{_markdown_item(block)}\n" for block in blocks[i:i + max_items]]
+        lines += ["\n", "---\n", "\n"]
+    return lines
+
+
+def iter_markdown(pages: Iterable[str], page_numbers: Optional[List[int]] = None) -> Iterator[str]:
+    """Markdown de un documento, línea a línea, a partir de sus páginas de texto en orden"""
+    selected = sorted(set(page_numbers)) if page_numbers is not None else None
+    for i, text in enumerate(pages):
+        page = (selected[i] if selected is not None and i < len(selected) else i) + 1
+        yield from page_to_markdown(text, page)
+
+
+def _tee_to_file(lines: Iterable[str], path: str) -> Iterator[str]:
+    # Copia las líneas a `path` mientras pasan; el fichero solo aparece si se completa
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for line in lines:
+                f.write(line)
+                yield line
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def pdf_to_slides(
+    pdf_path: str,
+    out_path: str,
+    markdown_path: Optional[str] = None,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    preserve_layout: bool = False,
+    engine: str = 'pdfminer',
+    cache_dir: Optional[str] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, str]:
+    """
+    Convierte un PDF en presentación ODP pasando por Markdown.
+
+    Devuelve (estado, mensaje) como convert_manual_to_odp.convert_file(): estado
+    es 'OK', 'OMITIDO' (sin texto) o 'ERROR'. Si se pasa `stats` se rellena con
+    'text_cache_hit', 'slides', 'slides_cached' y 'slides_rendered'.
+    """
+    if not os.path.isfile(pdf_path):
+        return 'ERROR', f"No existe el archivo PDF: {pdf_path}"
+    try:
+        engine = resolve_engine(engine, preserve_layout, False)
+    except ValueError as e:
+        return 'ERROR', str(e)
+
+    text_stats: Dict[str, Any] = {}
+    pages = iter_cached_pages(pdf_path, cache_dir, password, page_numbers, preserve_layout, engine,
+                              stats=text_stats)
+    lines = iter_markdown(pages, page_numbers)
+    if markdown_path:
+        lines = _tee_to_file(lines, markdown_path)
+    converter = FixedManualToODPConverter(
+        markdown_path,
+        out_path,
+        cache_dir=os.path.join(cache_dir, 'slides') if cache_dir else None,
+    )
+    try:
+        n_slides = converter.build_lines(lines)
+    except Exception as e:
+        if is_pdfminer_missing(e):
+            return 'ERROR', PDFMINER_MISSING
+        return 'ERROR', f"Error generando las slides: {e}"
+    finally:
+        # Cierra la cadena (y descarta temporales) si se detuvo antes de tiempo
+        lines.close()  # type: ignore[attr-defined]
+
+    cache = converter.render_cache
+    if stats is not None:
+        stats.update({
+            'text_cache_hit': text_stats.get('cache_hit', False),
+            'slides': n_slides,
+            'slides_cached': cache.hits if cache is not None else 0,
+            'slides_rendered': cache.misses if cache is not None else n_slides,
+        })
+    if not n_slides:
+        return 'OMITIDO', "Sin texto extraíble"
+    return 'OK', f"{out_path} ({n_slides} slides)"
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Convertir PDFs en presentaciones ODP (PDF → texto → Markdown → slides)")
+    parser.add_argument('inputs', nargs='+', help='Ficheros PDF, carpetas o patrones glob')
+    parser.add_argument('--out', dest='out', help='Ruta de salida (si un único PDF)')
+    parser.add_argument('--out-dir', dest='out_dir', help='Directorio de salida (replica el árbol de origen)')
+    parser.add_argument('--markdown', action='store_true', help='Guardar también el Markdown intermedio (<salida>.md)')
+    parser.add_argument('--cache-dir', dest='cache_dir', default=None, help='Caché de texto y de slides')
+    parser.add_argument('--password', dest='password', default=None, help='Contraseña del PDF')
+    parser.add_argument('--pages', dest='pages', default=None, help='Rango de páginas (1-indexed), ej: 1-3,5')
+    parser.add_argument('--preserve-layout', action='store_true', help='Intentar conservar layout')
+    parser.add_argument('--engine', dest='engine', default='pdfminer',
+                        help='Motor de extracción: pdfminer, pypdfium2, pdftotext o auto (por defecto pdfminer)')
+    args = parser.parse_args(argv)
+
+    try:
+        page_numbers = parse_pages(args.pages)
+        engine = resolve_engine(args.engine, args.preserve_layout, False)
+    except ValueError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    entries = expand_inputs(args.inputs)
+    if not entries:
+        print("[ERROR] No se encontraron PDFs en las entradas indicadas", file=sys.stderr)
+        return 1
+    if len(entries) > 1 and args.out:
+        print("[AVISO] --out se ignora con múltiples PDFs; usa --out-dir", file=sys.stderr)
+
+    counts = {'OK': 0, 'OMITIDO': 0, 'ERROR': 0}
+    # Misma ruta de salida que convert_manual_to_odp.py: el .odp junto a la entrada o
+    # bajo --out-dir replicando el árbol
+    for pdf_path, out_path in plan_jobs(entries, args.out, args.out_dir):
+        markdown_path = f"{os.path.splitext(out_path)[0]}.md" if args.markdown else None
+
+        stats: Dict[str, Any] = {}
+        status, msg = pdf_to_slides(
+            pdf_path,
+            out_path,
+            markdown_path=markdown_path,
+            password=args.password,
+            page_numbers=page_numbers,
+            preserve_layout=args.preserve_layout,
+            engine=engine,
+            cache_dir=args.cache_dir,
+            stats=stats,
+        )
+        counts[status] += 1
+        if status == 'OK' and args.cache_dir:
+            text = 'caché' if stats['text_cache_hit'] else 'extraído'
+            msg += f"; texto: {text}, slides reutilizadas {stats['slides_cached']}/{stats['slides']}"
+        print(f"[{status}] {pdf_path} -> {msg}", flush=True)
+
+    print(f"Resumen: {counts['OK']} convertidos, {counts['OMITIDO']} omitidos, {counts['ERROR']} con error")
+    return 1 if counts['ERROR'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
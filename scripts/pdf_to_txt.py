@@ -6,28 +6,81 @@ Conversor de PDF a TXT (basado en pdfminer.six)
 Uso básico:
   python scripts/pdf_to_txt.py /ruta/al/archivo.pdf
 
+Salida por stdout (se escribe página a página):
+  python scripts/pdf_to_txt.py archivo.pdf --out -
+
 Uso múltiple / carpeta de salida:
   python scripts/pdf_to_txt.py archivo1.pdf archivo2.pdf --out-dir salida/
 
+Carpetas y patrones (recursivo; se replica el árbol bajo --out-dir):
+  python scripts/pdf_to_txt.py docs/ 'proveedores/**/*.pdf' --out-dir salida/ --watch
+
 Opciones:
   --password <pwd>     Contraseña del PDF (si está protegido)
   --pages 1-3,5,9      Rango de páginas a extraer (1-indexed)
   --encoding utf-8     Codificación del TXT (por defecto utf-8)
   --overwrite          Sobrescribir si existe el TXT
   --preserve-layout    Intenta conservar layout (mejor para tablas simples)
+  --jobs N             Procesos en paralelo para varios PDFs (0 = todos los núcleos)
+  --timeout S          Tiempo máximo por documento; al superarlo se informa [TIMEOUT]
+  --max-rss-mb N       Memoria máxima por worker; se mata (en curso) o se recicla (entre documentos)
+  --max-docs-per-worker N  Reciclar cada worker tras N documentos
+  --page-jobs N        Procesos en paralelo por páginas dentro de un mismo PDF
+  --engine NOMBRE      Motor de extracción: pdfminer (por defecto), pypdfium2, pdftotext o auto
+                       (ver scripts/pdf_engines.py)
+  --cache-dir DIR      Caché de extracciones por hash del PDF + opciones (evita re-parsear)
+  --cache-max-mb N     Tamaño máximo de la caché (se expulsan las entradas menos usadas)
+  --cache-max-age-days N  Antigüedad máxima (desde el último uso) de las entradas de caché
+  --watch              Tras la pasada inicial, vigila las entradas y re-extrae solo lo que cambie
+  --watch-interval S   Segundos entre sondeos en modo --watch (por defecto 2)
+  --metrics out.json   Informe de métricas por documento y página (.json o .csv)
+  --profile DIR        Guarda perfiles cProfile (.pstats) de los documentos más lentos
+  --profile-top N      Cuántos perfiles conservar con --profile (por defecto 5)
+  --index DB           Actualiza un índice de texto completo por página (ver scripts/pdf_index.py)
+  --page-index         Escribe <salida>.pages.jsonl con offsets por página (ver scripts/pdf_pages.py)
+  --page-boxes         Incluye en ese índice las coordenadas de las cajas de texto
 """
 from __future__ import annotations
 import argparse
+import glob
+import hashlib
+import json
 import os
+import shutil
 import sys
-from typing import List, Tuple, Optional
+import time
+from io import StringIO, TextIOWrapper
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Sequence, TextIO, Tuple, Optional
 
 try:
-    from pdfminer.high_level import extract_text
-    from pdfminer.layout import LAParams
-except Exception as e:
-    sys.stderr.write("[ERROR] Falta la dependencia pdfminer.six. Instálala con: pip install pdfminer.six\n")
-    raise
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# pdfminer (y el pool de procesos, cProfile, csv) se importan solo cuando hace
+# falta: --help, errores de argumentos y ejecuciones en las que todas las
+# salidas ya existen no pagan su coste de arranque.
+if TYPE_CHECKING:
+    from pdfminer.layout import LAParams, LTPage
+
+PDFMINER_MISSING = "Falta la dependencia pdfminer.six. Instálala con: pip install pdfminer.six"
+
+
+def is_pdfminer_missing(error: BaseException) -> bool:
+    """True si `error` es la falta de pdfminer.six (y no la de otro módulo)."""
+    return isinstance(error, ModuleNotFoundError) and (error.name or '').split('.')[0] == 'pdfminer'
+
+# Ajustes típicos para intentar conservar layout básico
+PRESERVE_LAYOUT_PARAMS: Dict[str, Any] = dict(
+    line_margin=0.1,
+    char_margin=2.0,
+    word_margin=0.1,
+    boxes_flow=None,
+    detect_vertical=False,
+    all_texts=True,
+)
 
 
 def parse_pages(pages_arg: Optional[str]) -> Optional[List[int]]:
@@ -60,12 +113,428 @@ def parse_pages(pages_arg: Optional[str]) -> Optional[List[int]]:
     return [p - 1 for p in pages]
 
 
-def derive_output_path(pdf_path: str, out_dir: Optional[str]) -> str:
+def derive_output_path(pdf_path: str, out_dir: Optional[str], rel_path: Optional[str] = None) -> str:
+    if out_dir and rel_path:
+        # Replica el árbol de origen bajo out_dir
+        return os.path.join(out_dir, f"{os.path.splitext(rel_path)[0]}.txt")
     base_name = os.path.splitext(os.path.basename(pdf_path))[0]
     out_dir = out_dir or os.path.dirname(os.path.abspath(pdf_path))
     return os.path.join(out_dir, f"{base_name}.txt")
 
 
+def _is_pdf(path: str) -> bool:
+    return path.lower().endswith('.pdf')
+
+
+def _glob_root(pattern: str) -> str:
+    # Prefijo del patrón sin comodines: raíz respecto a la que se replica el árbol
+    parts = []
+    for part in pattern.replace(os.sep, '/').split('/'):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return '/'.join(parts) or '.'
+
+
+def expand_inputs(inputs: Sequence[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Expande rutas, carpetas (recursivo) y patrones glob a una lista de PDFs.
+
+    Devuelve pares (pdf_path, rel_path) sin duplicados y en orden estable;
+    rel_path es la ruta relativa a la carpeta o raíz del patrón (None para
+    ficheros indicados explícitamente, que no tienen árbol que replicar).
+    Las rutas que no existen se conservan tal cual para que se informe el error.
+    """
+    found: List[Tuple[str, Optional[str]]] = []
+    seen = set()
+
+    def add(path: str, rel_path: Optional[str]) -> None:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            found.append((path, rel_path))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if _is_pdf(name):
+                        path = os.path.join(root, name)
+                        add(path, os.path.relpath(path, item))
+        elif glob.has_magic(item):
+            root = _glob_root(item)
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path) and _is_pdf(path):
+                    add(path, os.path.relpath(path, root))
+        else:
+            add(item, None)
+    return found
+
+
+def snapshot_inputs(inputs: Sequence[str]) -> Dict[str, Tuple[int, int]]:
+    """Firma barata (tamaño, mtime_ns) de cada PDF de las entradas, para --watch."""
+    snapshot: Dict[str, Tuple[int, int]] = {}
+    for path, _rel in expand_inputs(inputs):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snapshot[path] = (st.st_size, st.st_mtime_ns)
+    return snapshot
+
+
+def build_laparams(preserve_layout: bool) -> Optional[LAParams]:
+    if not preserve_layout:
+        return None
+    from pdfminer.layout import LAParams
+
+    return LAParams(**PRESERVE_LAYOUT_PARAMS)
+
+
+@lru_cache(maxsize=None)
+def pdfminer_version() -> str:
+    import pdfminer
+
+    return getattr(pdfminer, '__version__', '')
+
+
+def count_pages(pdf_path: str, password: Optional[str] = None) -> int:
+    from pdfminer.pdfpage import PDFPage
+
+    # Solo recorre el árbol de páginas; no interpreta su contenido
+    with open(pdf_path, 'rb') as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp, password=password or ''))
+
+
+def shard_pages(page_numbers: Sequence[int], n_shards: int) -> List[List[int]]:
+    """Divide una lista de páginas (0-index) en tramos contiguos de tamaño similar."""
+    n_shards = max(1, min(n_shards, len(page_numbers)))
+    size, extra = divmod(len(page_numbers), n_shards)
+    shards: List[List[int]] = []
+    start = 0
+    for i in range(n_shards):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(list(page_numbers[start:end]))
+        start = end
+    return shards
+
+
+def _extract_shard(
+    pdf_path: str,
+    password: Optional[str],
+    page_numbers: List[int],
+    laparams: Optional[LAParams],
+) -> str:
+    from pdfminer.high_level import extract_text
+
+    return extract_text(pdf_path, password=password, page_numbers=page_numbers, laparams=laparams)
+
+
+def iter_text_sharded(
+    pdf_path: str,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    laparams: Optional[LAParams] = None,
+    n_workers: int = 0,
+) -> Iterator[str]:
+    """
+    Extrae el texto repartiendo las páginas entre varios procesos.
+
+    Cada tramo se extrae en su propio worker y los textos se producen en orden
+    de página a medida que están listos; como pdfminer termina cada página con
+    '\\f', concatenarlos da lo mismo que una única llamada a extract_text().
+    """
+    if n_workers <= 0:
+        n_workers = os.cpu_count() or 1
+
+    total = count_pages(pdf_path, password)
+    if page_numbers is None:
+        pages = list(range(total))
+    else:
+        # pdfminer recorre las páginas en orden de documento e ignora duplicados
+        pages = sorted({p for p in page_numbers if p < total})
+    # Ninguna página pedida existe: pdfminer trataría la lista vacía como "todas"
+    if not pages:
+        return
+
+    if n_workers <= 1 or len(pages) <= 1:
+        yield from iter_pages(pdf_path, password=password, page_numbers=pages, laparams=laparams)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Más tramos que workers para repartir mejor páginas de coste desigual
+    shards = shard_pages(pages, n_workers * 2)
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(shards))) as executor:
+        futures = [executor.submit(_extract_shard, pdf_path, password, shard, laparams) for shard in shards]
+        for future in futures:
+            yield future.result()
+
+
+def extract_text_sharded(
+    pdf_path: str,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    laparams: Optional[LAParams] = None,
+    n_workers: int = 0,
+) -> str:
+    """Equivalente a extract_text() usando iter_text_sharded()."""
+    return ''.join(iter_text_sharded(pdf_path, password, page_numbers, laparams, n_workers))
+
+
+def iter_pages(
+    pdf_path: str,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    laparams: Optional[LAParams] = None,
+    page_metrics: Optional[List[Dict[str, Any]]] = None,
+    page_boxes: Optional[List[List[Tuple[float, float, float, float, str]]]] = None,
+) -> Iterator[str]:
+    """
+    Extrae el texto página a página, en orden de documento.
+
+    Cada página (con el '\\f' final que añade pdfminer) se produce en cuanto
+    termina su análisis de layout, así que la memoria depende de la página más
+    grande y no del tamaño del documento. Unir todas las páginas da el mismo
+    texto que extract_text().
+
+    Si se pasa `page_metrics`, se añade a esa lista un dict por página con
+    tiempos, pico de RSS y recuentos de caracteres y objetos de layout.
+    Si se pasa `page_boxes`, se añade por página la lista de cajas de texto
+    (x0, y0, x1, y1, texto) en orden de lectura.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    if laparams is None:
+        laparams = LAParams()
+
+    # Número de página (1-index) de cada página producida, para las métricas
+    selected = sorted(set(page_numbers)) if page_numbers is not None else None
+
+    rsrcmgr = PDFResourceManager(caching=True)
+    with open(pdf_path, 'rb') as fp, StringIO() as buffer:
+        if page_metrics is None and page_boxes is None:
+            device = TextConverter(rsrcmgr, buffer, laparams=laparams)
+        else:
+            device = _metered_text_converter()(rsrcmgr, buffer, laparams=laparams)
+            device.collect_boxes = page_boxes is not None
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        try:
+            for i, page in enumerate(PDFPage.get_pages(fp, page_numbers, password=password or '')):
+                if page_metrics is None:
+                    interpreter.process_page(page)
+                    text = buffer.getvalue()
+                else:
+                    started, cpu_started = time.perf_counter(), time.process_time()
+                    interpreter.process_page(page)
+                    text = buffer.getvalue()
+                    page_metrics.append({
+                        'page': (selected[i] if selected is not None else i) + 1,
+                        'wall_s': round(time.perf_counter() - started, 6),
+                        'cpu_s': round(time.process_time() - cpu_started, 6),
+                        'peak_rss_kb': peak_rss_kb(),
+                        'chars': len(text),
+                        **device.last_counts,
+                    })
+                if page_boxes is not None:
+                    page_boxes.append(device.last_boxes)
+                yield text
+                buffer.seek(0)
+                buffer.truncate()
+        finally:
+            device.close()
+
+
+@lru_cache(maxsize=None)
+def _metered_text_converter() -> type:
+    # La clase se crea bajo demanda porque hereda de un tipo de pdfminer
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LTChar, LTContainer, LTTextBox
+
+    class _MeteredTextConverter(TextConverter):
+        """TextConverter que cuenta los objetos de layout (y opcionalmente las cajas) de cada página."""
+
+        collect_boxes = False
+
+        def receive_layout(self, ltpage: LTPage) -> None:
+            counts = {'layout_objects': 0, 'text_boxes': 0, 'glyphs': 0}
+            boxes = []
+            stack: List[Any] = [ltpage]
+            while stack:
+                item = stack.pop()
+                counts['layout_objects'] += 1
+                if isinstance(item, LTChar):
+                    counts['glyphs'] += 1
+                elif isinstance(item, LTTextBox):
+                    counts['text_boxes'] += 1
+                    if self.collect_boxes:
+                        x0, y0, x1, y1 = item.bbox
+                        boxes.append((round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2), item.get_text().strip()))
+                if isinstance(item, LTContainer):
+                    # En orden inverso para recorrer los hijos en orden de lectura
+                    stack.extend(reversed(list(item)))
+            self.last_counts = counts
+            self.last_boxes = boxes
+            super().receive_layout(ltpage)
+
+    return _MeteredTextConverter
+
+
+# --- Métricas de rendimiento ---
+
+def peak_rss_kb() -> Optional[int]:
+    """Pico de memoria residente del proceso actual en KB (None si no está disponible)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB; macOS en bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def write_metrics_report(path: str, documents: List[Dict[str, Any]]) -> None:
+    """
+    Escribe el informe de métricas: JSON (por defecto) o CSV si la ruta acaba en .csv.
+
+    En CSV hay una fila por página más una fila 'total' por documento.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if not path.lower().endswith('.csv'):
+        report = {
+            'generated': datetime.now().isoformat(),
+            'pdfminer': pdfminer_version(),
+            'documents': documents,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return
+
+    import csv
+
+    fields = ['pdf', 'page', 'ok', 'laparams', 'cache_hit', 'wall_s', 'cpu_s', 'peak_rss_kb',
+              'chars', 'layout_objects', 'text_boxes', 'glyphs']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for doc in documents:
+            for page in doc.get('page_metrics', []):
+                writer.writerow({'pdf': doc['pdf'], 'laparams': doc['laparams'], **page})
+            writer.writerow({**doc, 'page': 'total'})
+
+
+def keep_slowest_profiles(documents: List[Dict[str, Any]], top_n: int) -> None:
+    """Conserva solo los perfiles .pstats de los `top_n` documentos más lentos."""
+    profiled = [doc for doc in documents if doc.get('profile')]
+    profiled.sort(key=lambda doc: doc.get('wall_s', 0.0), reverse=True)
+    for doc in profiled[max(top_n, 0):]:
+        try:
+            os.remove(doc['profile'])
+        except OSError:
+            pass
+        doc['profile'] = None
+
+
+# --- Caché de extracciones direccionada por contenido ---
+#
+# Estructura de --cache-dir:
+#   objects/ab/<clave>.txt   texto ya codificado con la codificación pedida
+#   objects/ab/<clave>.json  manifiesto de la entrada (origen, opciones, tamaño, caracteres y páginas)
+# La clave es el sha256 del PDF más las opciones efectivas de extracción. El mtime
+# del .txt marca el último uso y es lo que usa la expulsión por tamaño/antigüedad.
+# Cada entrada se escribe con os.replace(), así que varios procesos pueden
+# compartir la misma caché sin bloqueos.
+
+CACHE_VERSION = 1
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(
+    pdf_hash: str,
+    page_numbers: Optional[List[int]],
+    preserve_layout: bool,
+    encoding: str,
+    password: Optional[str],
+    engine: str = 'pdfminer',
+) -> str:
+    options: Dict[str, Any] = {
+        'version': CACHE_VERSION,
+        'pdf': pdf_hash,
+        # pdfminer recorre las páginas en orden de documento e ignora duplicados
+        'pages': sorted(set(page_numbers)) if page_numbers is not None else None,
+        'laparams': PRESERVE_LAYOUT_PARAMS if preserve_layout else None,
+        'encoding': encoding.lower(),
+        'password': bool(password),
+    }
+    if engine == 'pdfminer':
+        options['pdfminer'] = pdfminer_version()
+    else:
+        # Las claves de pdfminer no incluyen el motor para no invalidar cachés existentes
+        from pdf_engines import engine_version
+
+        options['engine'] = f"{engine} {engine_version(engine)}"
+        options['laparams'] = bool(preserve_layout)
+    payload = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache_entry_paths(cache_dir: str, key: str) -> Tuple[str, str]:
+    base = os.path.join(cache_dir, 'objects', key[:2], key)
+    return f"{base}.txt", f"{base}.json"
+
+
+def evict_cache(
+    cache_dir: str,
+    max_bytes: Optional[int] = None,
+    max_age_days: Optional[float] = None,
+) -> Tuple[int, int]:
+    """
+    Expulsa entradas de la caché por antigüedad y, después, por tamaño (LRU).
+
+    Devuelve (entradas eliminadas, bytes liberados).
+    """
+    objects_dir = os.path.join(cache_dir, 'objects')
+    entries = []
+    for root, _dirs, files in os.walk(objects_dir):
+        for name in files:
+            if name.endswith('.txt'):
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort()  # menos usadas primero
+    total = sum(size for _, size, _ in entries)
+    cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+
+    removed = freed = 0
+    for last_used, size, path in entries:
+        too_old = cutoff is not None and last_used < cutoff
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            continue
+        for victim in (path, f"{path[:-len('.txt')]}.json"):
+            try:
+                os.remove(victim)
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+        freed += size
+    return removed, freed
+
+
 def pdf_to_txt(
     pdf_path: str,
     out_path: Optional[str] = None,
@@ -74,85 +543,932 @@ def pdf_to_txt(
     encoding: str = "utf-8",
     overwrite: bool = False,
     preserve_layout: bool = False,
+    page_jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    page_index: bool = False,
+    page_boxes: bool = False,
+    engine: str = "pdfminer",
+    metrics: Optional[Dict[str, Any]] = None,
 ) -> Tuple[bool, str]:
+    """
+    Convierte un PDF a TXT. Devuelve (ok, ruta de salida o mensaje de error).
+
+    Si se pasa un dict en `metrics`, se rellena con las métricas del documento:
+    tiempo de pared y CPU, pico de RSS, caracteres, objetos de layout, preset de
+    LAParams y, salvo en modo --page-jobs o acierto de caché, el detalle por
+    página en 'page_metrics'. El pico de RSS es el del proceso que extrae, que
+    en modo --jobs puede haber procesado documentos anteriores.
+
+    Con `page_index` se escribe junto a la salida un índice <salida>.pages.jsonl
+    para leer páginas sueltas con pdf_pages.PageReader; `page_boxes` añade las
+    coordenadas de las cajas de texto (extrae sin --page-jobs ni caché).
+
+    `engine` elige el motor de extracción (ver pdf_engines.resolve_engine());
+    con uno distinto de pdfminer se ignora `page_jobs` y las métricas por página
+    solo incluyen tiempos y caracteres.
+    """
+    if engine != 'pdfminer':
+        # pdf_engines solo hace falta con otros motores: con el de por defecto
+        # pdf_to_txt() funciona como librería sin scripts/ en sys.path
+        from pdf_engines import resolve_engine
+
+        try:
+            engine = resolve_engine(engine, preserve_layout, page_boxes)
+        except ValueError as e:
+            return False, str(e)
+
+    options = dict(
+        pdf_path=pdf_path,
+        out_path=out_path,
+        password=password,
+        page_numbers=page_numbers,
+        encoding=encoding,
+        overwrite=overwrite,
+        preserve_layout=preserve_layout,
+        page_jobs=page_jobs,
+        cache_dir=cache_dir,
+        page_index=page_index,
+        page_boxes=page_boxes,
+        engine=engine,
+    )
+    if metrics is None:
+        return _pdf_to_txt(**options)
+
+    laparams_values = None
+    if engine == 'pdfminer':
+        laparams = build_laparams(preserve_layout)
+        if laparams is None:
+            from pdfminer.layout import LAParams
+
+            laparams = LAParams()
+        laparams_values = vars(laparams)
+    metrics.update({
+        'pdf': pdf_path,
+        'engine': engine,
+        'laparams': 'preserve_layout' if preserve_layout else 'default',
+        'laparams_values': laparams_values,
+        'page_jobs': page_jobs,
+        'cache_hit': False,
+        'chars': 0,
+        'page_metrics': [],
+    })
+    started, cpu_started = time.perf_counter(), time.process_time()
+    ok, msg = _pdf_to_txt(metrics=metrics, **options)
+    page_metrics = metrics['page_metrics']
+    metrics.update({
+        'ok': ok,
+        'message': msg,
+        'wall_s': round(time.perf_counter() - started, 6),
+        'cpu_s': round(time.process_time() - cpu_started, 6),
+        'peak_rss_kb': peak_rss_kb(),
+    })
+    if metrics['cache_hit']:
+        # Sin extracción: 'chars' y 'pages' vienen del manifiesto de la entrada (None si
+        # es anterior y no los guarda) y el layout queda sin medir, que no es lo mismo que 0
+        metrics.update({'layout_objects': None, 'text_boxes': None, 'glyphs': None})
+    else:
+        metrics.update({
+            'pages': len(page_metrics),
+            'layout_objects': sum(page.get('layout_objects', 0) for page in page_metrics),
+            'text_boxes': sum(page.get('text_boxes', 0) for page in page_metrics),
+            'glyphs': sum(page.get('glyphs', 0) for page in page_metrics),
+        })
+    return ok, msg
+
+
+def _precheck(pdf_path: str, out_path: str, overwrite: bool, cache_dir: Optional[str]) -> Optional[str]:
+    # Comprobaciones baratas previas a la extracción; devuelve el error o None
     if not os.path.isfile(pdf_path):
-        return False, f"No existe el archivo PDF: {pdf_path}"
+        return f"No existe el archivo PDF: {pdf_path}"
+    # Con caché la salida es un derivado de ella y se regenera siempre
+    if out_path != '-' and os.path.exists(out_path) and not overwrite and cache_dir is None:
+        return f"Salida ya existe, usa --overwrite: {out_path}"
+    return None
 
+
+def _pdf_to_txt(
+    pdf_path: str,
+    out_path: Optional[str] = None,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    encoding: str = "utf-8",
+    overwrite: bool = False,
+    preserve_layout: bool = False,
+    page_jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    page_index: bool = False,
+    page_boxes: bool = False,
+    engine: str = "pdfminer",
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, str]:
     if out_path is None:
         out_path = derive_output_path(pdf_path, None)
 
-    # Crear directorio de salida si no existe
-    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
-
-    if os.path.exists(out_path) and not overwrite:
-        return False, f"Salida ya existe, usa --overwrite: {out_path}"
+    skip_msg = _precheck(pdf_path, out_path, overwrite, cache_dir)
+    if skip_msg is not None:
+        return False, skip_msg
 
-    laparams = None
-    if preserve_layout:
-        # Ajustes típicos para intentar conservar layout básico
-        laparams = LAParams(
-            line_margin=0.1,
-            char_margin=2.0,
-            word_margin=0.1,
-            boxes_flow=None,
-            detect_vertical=False,
-            all_texts=True,
-        )
+    to_stdout = out_path == '-'
+    if not to_stdout:
+        # Crear directorio de salida si no existe
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
 
     try:
-        text = extract_text(
-            pdf_path,
-            password=password,
-            page_numbers=page_numbers,
-            laparams=laparams,
-        )
-        with open(out_path, 'w', encoding=encoding, errors='ignore') as f:
-            f.write(text or '')
+        entry = None
+        if cache_dir is not None:
+            entry = _CacheEntry(cache_dir, pdf_path, password, page_numbers, preserve_layout, encoding, engine)
+            # Las cajas de texto no se guardan en caché: con page_boxes se extrae siempre
+            if entry.is_cached() and not page_boxes:
+                _copy_from_cache(entry.txt_path, out_path)
+                entry.touch()
+                if metrics is not None:
+                    metrics['cache_hit'] = True
+                    metrics['chars'], metrics['pages'] = entry.counts()
+                _update_page_index(out_path, page_index, encoding, page_numbers, None)
+                return True, f"{out_path} (caché)"
+
+        boxes: Optional[List[List[Tuple[float, float, float, float, str]]]] = [] if page_boxes else None
+        if engine != 'pdfminer':
+            from pdf_engines import iter_engine_pages
+
+            chunks = iter_engine_pages(engine, pdf_path, password, page_numbers, preserve_layout)
+            if metrics is not None:
+                chunks = _timed_pages(chunks, metrics['page_metrics'], page_numbers)
+        # Las cajas salen del layout de cada página: requieren la extracción en serie
+        elif page_jobs != 1 and not page_boxes:
+            chunks = iter_text_sharded(
+                pdf_path,
+                password=password,
+                page_numbers=page_numbers,
+                laparams=build_laparams(preserve_layout),
+                n_workers=page_jobs,
+            )
+        else:
+            chunks = iter_pages(
+                pdf_path,
+                password=password,
+                page_numbers=page_numbers,
+                laparams=build_laparams(preserve_layout),
+                page_metrics=metrics['page_metrics'] if metrics is not None else None,
+                page_boxes=boxes,
+            )
+
+        # Se escribe en temporales para no dejar un TXT (ni una entrada de caché)
+        # a medias si falla la extracción
+        tmp_paths = []
+        n_chars = n_pages = 0
+        try:
+            sinks: List[TextIO] = []
+            stdout_sink = None
+            if to_stdout:
+                # Un único flujo de texto para todo el documento: las codificaciones con
+                # BOM (utf-16, utf-8-sig...) lo escriben una vez y no una por página
+                stdout_sink = TextIOWrapper(sys.stdout.buffer, encoding=encoding, errors='ignore')
+                sinks.append(stdout_sink)
+            else:
+                tmp_paths.append(f"{out_path}.part")
+                sinks.append(open(tmp_paths[0], 'w', encoding=encoding, errors='ignore'))
+            if entry is not None:
+                tmp_paths.append(entry.tmp_path)
+                sinks.append(entry.open_sink())
+
+            try:
+                for chunk in chunks:
+                    n_chars += len(chunk)
+                    n_pages += chunk.count('\f')
+                    for sink in sinks:
+                        sink.write(chunk)
+                    if stdout_sink is not None:
+                        stdout_sink.flush()
+            finally:
+                for sink in sinks:
+                    if sink is stdout_sink:
+                        # Se suelta sin cerrar sys.stdout
+                        sink.flush()
+                        sink.detach()
+                    else:
+                        sink.close()
+
+            if not to_stdout:
+                os.replace(tmp_paths[0], out_path)
+            if entry is not None:
+                entry.commit(n_chars, n_pages)
+        finally:
+            if metrics is not None:
+                metrics['chars'] = n_chars
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        _update_page_index(out_path, page_index or page_boxes, encoding, page_numbers, boxes)
         return True, out_path
     except Exception as e:
+        if is_pdfminer_missing(e):
+            return False, PDFMINER_MISSING
         return False, f"Error extrayendo texto: {e}"
 
 
+def _timed_pages(
+    chunks: Iterator[str],
+    page_metrics: List[Dict[str, Any]],
+    page_numbers: Optional[List[int]],
+) -> Iterator[str]:
+    # Métricas por página para motores sin layout de pdfminer: solo tiempos y caracteres
+    selected = sorted(set(page_numbers)) if page_numbers is not None else None
+    i = 0
+    while True:
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            text = next(chunks)
+        except StopIteration:
+            return
+        page_metrics.append({
+            'page': (selected[i] if selected is not None and i < len(selected) else i) + 1,
+            'wall_s': round(time.perf_counter() - started, 6),
+            'cpu_s': round(time.process_time() - cpu_started, 6),
+            'peak_rss_kb': peak_rss_kb(),
+            'chars': len(text),
+        })
+        yield text
+        i += 1
+
+
+def _update_page_index(
+    out_path: str,
+    enabled: bool,
+    encoding: str,
+    page_numbers: Optional[List[int]],
+    boxes: Optional[List[List[Tuple[float, float, float, float, str]]]],
+) -> None:
+    if out_path == '-':
+        return
+    if enabled:
+        from pdf_pages import build_page_index
+
+        build_page_index(out_path, encoding=encoding, page_numbers=page_numbers, boxes=boxes)
+        return
+
+    try:
+        from pdf_pages import page_index_path
+    except ModuleNotFoundError:
+        # Uso como librería sin scripts/ en sys.path y sin --page-index: no se
+        # comprueba si queda un índice antiguo
+        return
+    if os.path.exists(page_index_path(out_path)):
+        # Un índice de una extracción anterior ya no corresponde con la salida
+        os.remove(page_index_path(out_path))
+
+
+def _copy_from_cache(cache_txt: str, out_path: str) -> None:
+    if out_path == '-':
+        with open(cache_txt, 'rb') as src:
+            shutil.copyfileobj(src, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+        return
+    tmp_path = f"{out_path}.part"
+    try:
+        shutil.copyfile(cache_txt, tmp_path)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_cache_meta(meta_path: str, meta: Dict[str, Any]) -> None:
+    tmp_path = f"{meta_path}.{os.getpid()}.part"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+class _CacheEntry:
+    """
+    Entrada de la caché de extracciones para un PDF y unas opciones.
+
+    Reúne la clave, las rutas y la escritura (temporal con el pid del proceso,
+    os.replace() y manifiesto) que comparten pdf_to_txt() e iter_cached_pages().
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        pdf_path: str,
+        password: Optional[str],
+        page_numbers: Optional[List[int]],
+        preserve_layout: bool,
+        encoding: str,
+        engine: str,
+    ):
+        self.pdf_path = pdf_path
+        self.pdf_hash = file_sha256(pdf_path)
+        self.page_numbers = page_numbers
+        self.preserve_layout = preserve_layout
+        self.encoding = encoding
+        self.engine = engine
+        self.password = bool(password)
+        key = cache_key(self.pdf_hash, page_numbers, preserve_layout, encoding, password, engine)
+        self.txt_path, self.meta_path = _cache_entry_paths(cache_dir, key)
+        # Con el pid, dos procesos que extraen el mismo PDF no comparten temporal
+        self.tmp_path = f"{self.txt_path}.{os.getpid()}.part"
+
+    def is_cached(self) -> bool:
+        return os.path.isfile(self.txt_path)
+
+    def touch(self) -> None:
+        os.utime(self.txt_path)  # marca de último uso para la expulsión LRU
+
+    def open_sink(self) -> TextIO:
+        os.makedirs(os.path.dirname(self.txt_path), exist_ok=True)
+        return open(self.tmp_path, 'w', encoding=self.encoding, errors='ignore')
+
+    def counts(self) -> Tuple[Optional[int], Optional[int]]:
+        """(caracteres, páginas) del texto guardado; None si el manifiesto no los tiene."""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        return meta.get('chars'), meta.get('page_count')
+
+    def commit(self, chars: int, page_count: int) -> None:
+        # Con el temporal ya cerrado: publica el TXT y después su manifiesto
+        os.replace(self.tmp_path, self.txt_path)
+        _write_cache_meta(self.meta_path, {
+            'source': os.path.abspath(self.pdf_path),
+            'sha256': self.pdf_hash,
+            'pages': self.page_numbers,
+            'preserve_layout': self.preserve_layout,
+            'engine': self.engine,
+            'encoding': self.encoding,
+            'password': self.password,
+            'size': os.path.getsize(self.txt_path),
+            'chars': chars,
+            'page_count': page_count,
+            'created': time.time(),
+        })
+
+    def discard(self) -> None:
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def iter_cached_pages(
+    pdf_path: str,
+    cache_dir: Optional[str] = None,
+    password: Optional[str] = None,
+    page_numbers: Optional[List[int]] = None,
+    preserve_layout: bool = False,
+    engine: str = 'pdfminer',
+    encoding: str = 'utf-8',
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    Texto del PDF página a página (con el '\\f' final) pasando por la caché de extracciones.
+
+    Con acierto de caché las páginas se leen del TXT cacheado; si no, se extraen
+    y se escriben a la vez en la caché, así que quien consume empieza a trabajar
+    con la primera página. Las entradas son las mismas que usa pdf_to_txt() con
+    `cache_dir`. `engine` debe venir resuelto (ver pdf_engines.resolve_engine());
+    si se pasa `stats` se anota en él 'cache_hit'.
+    """
+    entry = None
+    if cache_dir is not None:
+        entry = _CacheEntry(cache_dir, pdf_path, password, page_numbers, preserve_layout, encoding, engine)
+        if entry.is_cached():
+            entry.touch()
+            if stats is not None:
+                stats['cache_hit'] = True
+            yield from _iter_txt_pages(entry.txt_path, encoding)
+            return
+    if stats is not None:
+        stats['cache_hit'] = False
+
+    if engine != 'pdfminer':
+        from pdf_engines import iter_engine_pages
+
+        chunks = iter_engine_pages(engine, pdf_path, password, page_numbers, preserve_layout)
+    else:
+        chunks = iter_pages(pdf_path, password=password, page_numbers=page_numbers,
+                            laparams=build_laparams(preserve_layout))
+    if entry is None:
+        yield from chunks
+        return
+
+    # Si la extracción falla o quien consume se detiene, no queda una entrada a medias
+    n_chars = n_pages = 0
+    try:
+        with entry.open_sink() as sink:
+            for chunk in chunks:
+                sink.write(chunk)
+                n_chars += len(chunk)
+                n_pages += chunk.count('\f')
+                yield chunk
+        entry.commit(n_chars, n_pages)
+    finally:
+        entry.discard()
+
+
+def _iter_txt_pages(txt_path: str, encoding: str, block_size: int = 1 << 16) -> Iterator[str]:
+    # Páginas de un TXT separadas por '\f', leyendo por bloques
+    with open(txt_path, 'r', encoding=encoding, errors='ignore', newline='') as f:
+        pending = ''
+        for block in iter(lambda: f.read(block_size), ''):
+            pending += block
+            *pages, pending = pending.split('\f')
+            for page in pages:
+                yield page + '\f'
+        if pending:
+            yield pending
+
+
+def _run_job(
+    pdf_path: str,
+    out_path: str,
+    options: Dict[str, Any],
+    collect_metrics: bool = False,
+    profile_path: Optional[str] = None,
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    # Punto de entrada de los workers: nunca debe propagar excepciones
+    metrics: Optional[Dict[str, Any]] = {} if collect_metrics else None
+    profiler = None
+    if profile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            ok, msg = pdf_to_txt(pdf_path=pdf_path, out_path=out_path, metrics=metrics, **options)
+        finally:
+            if profiler is not None and profile_path is not None:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+                if metrics is not None:
+                    metrics['profile'] = profile_path
+    except Exception as e:
+        ok, msg = False, f"Error extrayendo texto: {e}"
+    return ok, msg, metrics
+
+
+# Clases de fallo de los workers supervisados (prefijos del mensaje de error)
+CRASH_MSG = "El proceso de extracción terminó inesperadamente"
+TIMEOUT_MSG = "Tiempo límite excedido"
+MEMORY_MSG = "Límite de memoria excedido"
+
+
+def _current_rss_kb(pid: int) -> Optional[int]:
+    # RSS actual de otro proceso; solo disponible donde existe /proc (Linux)
+    try:
+        with open(f"/proc/{pid}/statm", 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _worker_loop(conn: Any, options: Dict[str, Any], collect_metrics: bool) -> None:
+    # Proceso de extracción supervisado: atiende documentos hasta recibir None
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        index, pdf_path, out_path, profile_path = task
+        ok, msg, doc = _run_job(pdf_path, out_path, options, collect_metrics, profile_path)
+        conn.send((index, ok, msg, doc, peak_rss_kb()))
+
+
+class _ExtractionWorker:
+    """Proceso worker con su canal, el documento en curso y los documentos atendidos."""
+
+    def __init__(self, ctx: Any, options: Dict[str, Any], collect_metrics: bool):
+        self.conn, child_conn = ctx.Pipe()
+        # No daemónico: con --page-jobs el worker arranca a su vez procesos hijos.
+        # _supervised_batch() los detiene o mata siempre al terminar, y si el padre
+        # muere el worker sale al recibir EOF del canal
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn, options, collect_metrics))
+        self.process.start()
+        child_conn.close()
+        self.cache_dir: Optional[str] = options.get('cache_dir')
+        self.task: Optional[int] = None
+        self.out_path: Optional[str] = None
+        self.started = 0.0
+        self.done = 0
+
+    def assign(self, index: int, pdf_path: str, out_path: str, profile_path: Optional[str]) -> None:
+        self.conn.send((index, pdf_path, out_path, profile_path))
+        self.task = index
+        self.out_path = out_path
+        self.started = time.monotonic()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        if self.task is not None:
+            self._remove_partial_outputs()
+
+    def _remove_partial_outputs(self) -> None:
+        # Un worker matado a mitad de documento no llega a borrar sus temporales:
+        # el .part de la salida y los de la caché (que llevan el pid del worker)
+        tmp_paths = []
+        if self.out_path and self.out_path != '-':
+            tmp_paths.append(f"{self.out_path}.part")
+        if self.cache_dir:
+            tmp_paths += glob.glob(os.path.join(glob.escape(self.cache_dir), 'objects', '*',
+                                                f"*.{self.process.pid}.part"))
+        for tmp_path in tmp_paths:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _supervised_batch(
+    jobs: Sequence[Tuple[str, str]],
+    pending: List[int],
+    n_jobs: int,
+    options: Dict[str, Any],
+    collect_metrics: bool,
+    profile_dir: Optional[str],
+    timeout: Optional[float],
+    max_rss_mb: Optional[float],
+    max_docs_per_worker: Optional[int],
+) -> Iterator[Tuple[int, Tuple[bool, str, Optional[Dict[str, Any]]]]]:
+    """
+    Reparte documentos entre workers supervisados y produce (índice, resultado)
+    según terminan.
+
+    Cada worker atiende un documento cada vez, así que si muere, agota el tiempo
+    o supera el límite de memoria solo falla ese documento: se mata el proceso,
+    se informa la clase de fallo y se arranca otro. Los workers se reciclan tras
+    `max_docs_per_worker` documentos o si su pico de RSS supera `max_rss_mb`.
+    """
+    import multiprocessing
+    from collections import deque
+    from multiprocessing.connection import wait
+
+    ctx = multiprocessing.get_context()
+    max_rss_kb = int(max_rss_mb * 1024) if max_rss_mb else None
+    queue = deque(pending)
+    workers: List[_ExtractionWorker] = []
+
+    def failure(index: int, msg: str, failure_class: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        doc = {'pdf': jobs[index][0], 'ok': False, 'message': msg, 'failure': failure_class}
+        return False, msg, doc if collect_metrics else None
+
+    try:
+        while queue or any(w.task is not None for w in workers):
+            while len(workers) < n_jobs and len(workers) < len(queue) + sum(w.task is not None for w in workers):
+                workers.append(_ExtractionWorker(ctx, options, collect_metrics))
+            for worker in workers:
+                if worker.task is None and queue:
+                    i = queue.popleft()
+                    worker.assign(i, jobs[i][0], jobs[i][1], _profile_path(profile_dir, i, jobs[i][0]))
+
+            busy = [w for w in workers if w.task is not None]
+            wait_for = 0.25
+            if timeout is not None:
+                now = time.monotonic()
+                wait_for = max(0.0, min([wait_for] + [w.started + timeout - now for w in busy]))
+            wait([w.conn for w in busy] + [w.process.sentinel for w in busy], timeout=wait_for)
+
+            for worker in busy:
+                index = worker.task
+                assert index is not None
+                retire = False
+                if worker.conn.poll():
+                    try:
+                        _, ok, msg, doc, worker_peak_kb = worker.conn.recv()
+                    except (EOFError, OSError):
+                        worker.kill()
+                        yield index, failure(index, CRASH_MSG, 'crash')
+                        workers.remove(worker)
+                        continue
+                    worker.task = None
+                    worker.done += 1
+                    yield index, (ok, msg, doc)
+                    # Reciclado: tras N documentos o si el worker ha crecido por encima del límite
+                    retire = bool(max_docs_per_worker and worker.done >= max_docs_per_worker) or bool(
+                        max_rss_kb and worker_peak_kb and worker_peak_kb > max_rss_kb
+                    )
+                    if retire:
+                        worker.stop()
+                        workers.remove(worker)
+                elif not worker.process.is_alive():
+                    worker.kill()
+                    yield index, failure(index, CRASH_MSG, 'crash')
+                    workers.remove(worker)
+                elif timeout is not None and time.monotonic() - worker.started > timeout:
+                    worker.kill()
+                    yield index, failure(index, f"{TIMEOUT_MSG} ({timeout:g}s)", 'timeout')
+                    workers.remove(worker)
+                elif max_rss_kb and (_current_rss_kb(worker.process.pid) or 0) > max_rss_kb:
+                    worker.kill()
+                    yield index, failure(index, f"{MEMORY_MSG} ({max_rss_mb:g} MB)", 'memory')
+                    workers.remove(worker)
+    finally:
+        for worker in workers:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+
+def _profile_path(profile_dir: Optional[str], index: int, pdf_path: str) -> Optional[str]:
+    if not profile_dir:
+        return None
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(profile_dir, f"{index:05d}_{base_name}.pstats")
+
+
+def pdf_to_txt_batch(
+    jobs: Sequence[Tuple[str, str]],
+    n_jobs: int = 1,
+    metrics: Optional[List[Dict[str, Any]]] = None,
+    profile_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_rss_mb: Optional[float] = None,
+    max_docs_per_worker: Optional[int] = None,
+    **options: Any,
+) -> Iterator[Tuple[str, bool, str]]:
+    """
+    Convierte varios PDFs (pares (pdf_path, out_path)) con procesos worker.
+
+    Devuelve (pdf_path, ok, msg) en el mismo orden que `jobs`, sea cual sea el
+    orden en que terminen los workers. `options` se pasa tal cual a pdf_to_txt().
+    Cada worker atiende un documento cada vez: si muere (segfault, OOM...), solo
+    ese documento termina en error y el resto del lote sigue.
+
+    `timeout` (segundos por documento) y `max_rss_mb` (RSS del worker) matan al
+    worker que los supere y el documento falla con TIMEOUT_MSG / MEMORY_MSG;
+    `max_docs_per_worker` recicla los workers tras N documentos. Con cualquiera
+    de ellos la extracción se aísla en workers aunque `n_jobs` sea 1.
+
+    Si se pasa una lista en `metrics`, se le añaden (en el mismo orden) las
+    métricas de cada documento; con `profile_dir` se guarda además un perfil
+    cProfile por documento (ver keep_slowest_profiles()).
+    """
+    collect = metrics is not None or profile_dir is not None
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    def emit(index: int, ok: bool, msg: str, doc: Optional[Dict[str, Any]]) -> Tuple[str, bool, str]:
+        pdf_path = jobs[index][0]
+        if metrics is not None:
+            metrics.append(doc or {'pdf': pdf_path, 'ok': ok, 'message': msg})
+        return pdf_path, ok, msg
+
+    if n_jobs <= 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(jobs))
+    supervised = timeout is not None or max_rss_mb is not None or max_docs_per_worker is not None
+
+    if n_jobs <= 1 and not supervised:
+        for i, (pdf_path, out_path) in enumerate(jobs):
+            ok, msg, doc = _run_job(pdf_path, out_path, options, collect, _profile_path(profile_dir, i, pdf_path))
+            yield emit(i, ok, msg, doc)
+        return
+
+    results: Dict[int, Tuple[bool, str, Optional[Dict[str, Any]]]] = {}
+    next_index = 0
+
+    # Lo que se descarta sin extraer (PDF inexistente, salida ya presente) se
+    # resuelve aquí, sin arrancar workers
+    pending = []
+    for i, (pdf_path, out_path) in enumerate(jobs):
+        skip_msg = _precheck(pdf_path, out_path, options.get('overwrite', False), options.get('cache_dir'))
+        if skip_msg is None:
+            pending.append(i)
+        else:
+            results[i] = (False, skip_msg, None)
+
+    while next_index in results:
+        ok, msg, doc = results.pop(next_index)
+        yield emit(next_index, ok, msg, doc)
+        next_index += 1
+
+    if not pending:
+        return
+
+    for i, result in _supervised_batch(
+        jobs, pending, max(n_jobs, 1), options, collect, profile_dir, timeout, max_rss_mb, max_docs_per_worker,
+    ):
+        results[i] = result
+        # Emitir en orden todo lo que ya esté disponible
+        while next_index in results:
+            ok, msg, doc = results.pop(next_index)
+            yield emit(next_index, ok, msg, doc)
+            next_index += 1
+
+
+def watch_inputs(
+    inputs: Sequence[str],
+    on_change: Callable[[List[str]], None],
+    interval: float = 2.0,
+) -> None:
+    """
+    Sondea las entradas y llama a on_change() con los PDFs nuevos o modificados.
+
+    Usa la firma (tamaño, mtime) de snapshot_inputs() en lugar de re-parsear o
+    hashear. Un PDF solo se entrega cuando su firma se mantiene igual entre dos
+    sondeos seguidos, para no extraer ficheros que todavía se están copiando.
+    Bucle infinito: se interrumpe con KeyboardInterrupt.
+    """
+    known = snapshot_inputs(inputs)
+    pending: Dict[str, Tuple[int, int]] = {}
+    while True:
+        time.sleep(interval)
+        current = snapshot_inputs(inputs)
+        changed = {path: sig for path, sig in current.items() if known.get(path) != sig}
+        ready = [path for path, sig in changed.items() if pending.get(path) == sig]
+        pending = {path: sig for path, sig in changed.items() if path not in ready}
+        # Los PDFs borrados se olvidan: si reaparecen se tratan como nuevos
+        known = {path: sig for path, sig in known.items() if path in current}
+        if ready:
+            known.update((path, current[path]) for path in ready)
+            on_change(ready)
+
+
 def main(argv: List[str]) -> int:
     parser = argparse.ArgumentParser(description="Convertir PDF a TXT usando pdfminer.six")
     parser.add_argument('pdfs', nargs='+', help='Rutas de archivo PDF a convertir')
-    parser.add_argument('--out', dest='out', help='Ruta de salida (si un único PDF)')
+    parser.add_argument('--out', dest='out', help='Ruta de salida (si un único PDF; "-" para stdout)')
     parser.add_argument('--out-dir', dest='out_dir', help='Directorio de salida (si múltiples PDFs)')
     parser.add_argument('--password', dest='password', default=None, help='Contraseña del PDF (si aplica)')
     parser.add_argument('--pages', dest='pages', default=None, help='Rango de páginas, ej: 1-3,5,9')
     parser.add_argument('--encoding', dest='encoding', default='utf-8', help='Codificación del TXT (por defecto utf-8)')
     parser.add_argument('--overwrite', action='store_true', help='Sobrescribir si el archivo de salida existe')
     parser.add_argument('--preserve-layout', action='store_true', help='Intentar preservar layout (tablas simples)')
+    parser.add_argument('--jobs', dest='jobs', type=int, default=1, help='Procesos en paralelo (0 = todos los núcleos)')
+    parser.add_argument('--timeout', dest='timeout', type=float, default=None,
+                        help='Segundos máximos por documento (aísla la extracción en workers)')
+    parser.add_argument('--max-rss-mb', dest='max_rss_mb', type=float, default=None,
+                        help='Memoria residente máxima por worker en MB')
+    parser.add_argument('--max-docs-per-worker', dest='max_docs_per_worker', type=int, default=None,
+                        help='Reciclar cada worker tras N documentos')
+    parser.add_argument('--page-jobs', dest='page_jobs', type=int, default=1,
+                        help='Procesos por documento, repartiendo sus páginas (0 = todos los núcleos)')
+    parser.add_argument('--engine', dest='engine', default='pdfminer',
+                        help='Motor de extracción: pdfminer, pypdfium2, pdftotext o auto (por defecto pdfminer)')
+    parser.add_argument('--cache-dir', dest='cache_dir', default=None,
+                        help='Directorio de caché de extracciones (clave: hash del PDF + opciones)')
+    parser.add_argument('--cache-max-mb', dest='cache_max_mb', type=float, default=None,
+                        help='Tamaño máximo de la caché en MB')
+    parser.add_argument('--cache-max-age-days', dest='cache_max_age_days', type=float, default=None,
+                        help='Días sin uso tras los que se expulsa una entrada de la caché')
+
+    parser.add_argument('--watch', action='store_true',
+                        help='Vigilar las entradas y re-extraer solo los PDFs nuevos o modificados')
+    parser.add_argument('--watch-interval', dest='watch_interval', type=float, default=2.0,
+                        help='Segundos entre sondeos en modo --watch (por defecto 2)')
+    parser.add_argument('--metrics', dest='metrics', default=None,
+                        help='Escribir métricas por documento y página (JSON, o CSV si acaba en .csv)')
+    parser.add_argument('--profile', dest='profile', default=None,
+                        help='Directorio donde guardar perfiles cProfile (.pstats) de los documentos más lentos')
+    parser.add_argument('--profile-top', dest='profile_top', type=int, default=5,
+                        help='Número de perfiles a conservar con --profile (por defecto 5)')
+    parser.add_argument('--index', dest='index', default=None,
+                        help='Base de datos SQLite FTS5 a actualizar con el texto extraído (por página)')
+    parser.add_argument('--page-index', action='store_true',
+                        help='Escribir <salida>.pages.jsonl con el offset de cada página para acceso aleatorio')
+    parser.add_argument('--page-boxes', action='store_true',
+                        help='Incluir en el índice de páginas las coordenadas de las cajas de texto')
 
     args = parser.parse_args(argv)
 
     page_numbers = parse_pages(args.pages) if args.pages else None
 
-    if len(args.pdfs) > 1 and args.out:
+    # Con pdfminer (por defecto) no se comprueba aquí si está instalado: cada documento
+    # falla con PDFMINER_MISSING y los que ya tienen salida se siguen omitiendo
+    if args.engine != 'pdfminer':
+        from pdf_engines import resolve_engine
+
+        try:
+            # Se resuelve una vez aquí para que todos los documentos usen el mismo motor
+            args.engine = resolve_engine(args.engine, args.preserve_layout, args.page_boxes)
+        except ValueError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+
+    entries = expand_inputs(args.pdfs)
+    if not entries:
+        print("[ERROR] No se encontraron PDFs en las entradas indicadas", file=sys.stderr)
+        return 1
+
+    if len(entries) > 1 and args.out:
         print("[AVISO] --out se ignora con múltiples PDFs; usa --out-dir", file=sys.stderr)
 
-    results = []
-    for i, pdf in enumerate(args.pdfs):
-        if len(args.pdfs) == 1:
-            out_path = args.out or derive_output_path(pdf, args.out_dir)
+    ok = _run_cli_batch(entries, args, page_numbers, overwrite=args.overwrite)
+
+    if args.watch:
+        def on_change(paths: List[str]) -> None:
+            changed = set(paths)
+            started = time.monotonic()
+            _run_cli_batch(
+                [(pdf, rel) for pdf, rel in expand_inputs(args.pdfs) if pdf in changed],
+                args,
+                page_numbers,
+                overwrite=True,
+            )
+            print(f"[WATCH] {len(changed)} PDF(s) procesados en {time.monotonic() - started:.2f}s", file=sys.stderr)
+
+        print(f"[WATCH] Vigilando {len(args.pdfs)} entrada(s); Ctrl+C para salir", file=sys.stderr)
+        try:
+            watch_inputs(args.pdfs, on_change, interval=args.watch_interval)
+        except KeyboardInterrupt:
+            return 0
+
+    # Código de salida: 0 si todos OK; 1 si alguno falló
+    return 0 if ok else 1
+
+
+def _run_cli_batch(
+    entries: List[Tuple[str, Optional[str]]],
+    args: argparse.Namespace,
+    page_numbers: Optional[List[int]],
+    overwrite: bool,
+) -> bool:
+    jobs = []
+    for pdf, rel_path in entries:
+        if len(entries) == 1 and rel_path is None and args.out:
+            out_path = args.out
         else:
-            out_path = derive_output_path(pdf, args.out_dir)
-
-        ok, msg = pdf_to_txt(
-            pdf_path=pdf,
-            out_path=out_path,
-            password=args.password,
-            page_numbers=page_numbers,
-            encoding=args.encoding,
-            overwrite=args.overwrite,
-            preserve_layout=args.preserve_layout,
-        )
+            out_path = derive_output_path(pdf, args.out_dir, rel_path)
+        jobs.append((pdf, out_path))
+
+    # Con --out - el texto va a stdout; el estado se informa por stderr
+    status_stream = sys.stderr if len(jobs) == 1 and jobs[0][1] == '-' else sys.stdout
+
+    documents: Optional[List[Dict[str, Any]]] = [] if args.metrics or args.profile else None
+
+    index_conn = None
+    if args.index:
+        from pdf_index import index_text_file, open_index
+
+        index_conn = open_index(args.index)
+
+    results = []
+    for i, (pdf, ok, msg) in enumerate(pdf_to_txt_batch(
+        jobs,
+        n_jobs=args.jobs,
+        metrics=documents,
+        profile_dir=args.profile,
+        timeout=args.timeout,
+        max_rss_mb=args.max_rss_mb,
+        max_docs_per_worker=args.max_docs_per_worker,
+        password=args.password,
+        page_numbers=page_numbers,
+        encoding=args.encoding,
+        overwrite=overwrite,
+        preserve_layout=args.preserve_layout,
+        page_jobs=args.page_jobs,
+        cache_dir=args.cache_dir,
+        page_index=args.page_index,
+        page_boxes=args.page_boxes,
+        engine=args.engine,
+    )):
         results.append((ok, msg))
-        status = 'OK' if ok else 'ERROR'
-        print(f"[{status}] {pdf} -> {msg}")
+        if ok:
+            status = 'OK'
+        elif msg.startswith(TIMEOUT_MSG):
+            status = 'TIMEOUT'
+        else:
+            status = 'ERROR'
+        print(f"[{status}] {pdf} -> {msg}", file=status_stream, flush=True)
 
-    # Código de salida: 0 si todos OK; 1 si alguno falló
-    return 0 if all(ok for ok, _ in results) else 1
+        # El índice se actualiza en el proceso principal, a medida que llega cada documento
+        out_path = jobs[i][1]
+        if index_conn is not None and ok and out_path != '-':
+            index_text_file(index_conn, out_path, source_path=pdf, page_numbers=page_numbers, encoding=args.encoding)
+
+    if index_conn is not None:
+        index_conn.close()
+
+    if documents is not None:
+        if args.profile:
+            keep_slowest_profiles(documents, args.profile_top)
+        if args.metrics:
+            write_metrics_report(args.metrics, documents)
+
+    if args.cache_dir and (args.cache_max_mb is not None or args.cache_max_age_days is not None):
+        max_bytes = int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb is not None else None
+        removed, freed = evict_cache(args.cache_dir, max_bytes, args.cache_max_age_days)
+        if removed:
+            print(f"[CACHE] {removed} entradas expulsadas ({freed / (1024 * 1024):.1f} MB)", file=sys.stderr)
+
+    return all(ok for ok, _ in results)
 
 
 if __name__ == '__main__':